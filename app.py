@@ -1,21 +1,55 @@
 import streamlit as st
-from db import init_db, authenticate_user, get_background_color, is_db_configured
+from db import (
+    init_db,
+    authenticate_user,
+    get_background_color,
+    is_db_configured,
+    start_query_profile,
+    stop_query_profile,
+    N_PLUS_ONE_THRESHOLD,
+    get_events,
+    get_events_for_judge,
+    create_event,
+    archive_event,
+    unarchive_event,
+    set_current_event,
+    bind_causal_token,
+)
 import views.judges_page as judges_page
 import views.competitors_page as competitors_page
 import views.scoring_page as scoring_page
 import views.leaderboard_page as leaderboard_page
 import views.questions_page as questions_page
+from page_data import PageLoadTimeout
 
 def main():
     # Setup Streamlit page
     st.set_page_config(page_title="Judging Tool", layout="wide")
 
+    # Analytics reads on secondaries wait for this session's own writes
+    bind_causal_token(st.session_state.setdefault("causal_token", {}))
+
+    # Admins get a summary of the queries each rerun issued
+    user = st.session_state.get("user")
+    if not user or user["role"] != "admin":
+        render_app()
+        return
+    profile = start_query_profile()
+    try:
+        render_app()
+    finally:
+        stop_query_profile()
+    render_query_profile(profile)
+
+def render_app():
     # Create DB tables if it doesn't exist
     init_db()
-    apply_background_theme()
+    # Script runs reuse threads; use the default event until one is selected
+    set_current_event(None)
 
     user = st.session_state.get("user")
     if not user:
+        apply_background_theme()
         render_login()
         return
 
@@ -24,8 +58,13 @@ def main():
     st.sidebar.write(f"Logged in as **{user['username']}** ({user['role']})")
     if st.sidebar.button("Log out"):
         st.session_state.pop("user", None)
+        st.session_state.pop("event_id", None)
         st.rerun()
 
+    render_event_switcher(user)
+    # The colour is an event setting, so only once the event is set
+    apply_background_theme()
+
     if user["role"] == "admin":
         page = st.sidebar.radio("Navigation", [
             "Manage Judges", "Manage Competitors", "Manage Questions", "Customize", "Leaderboard"
@@ -35,6 +74,12 @@ def main():
             "Enter Scores"
         ])
 
+    try:
+        render_page(page)
+    except PageLoadTimeout as exc:
+        st.error(f"The database is responding slowly ({exc}). Try again in a moment.")
+
+def render_page(page):
     # Routes to correct page
     if page == "Manage Judges":
         judges_page.show()
@@ -50,6 +95,69 @@ def main():
     elif page == "Leaderboard":
         leaderboard_page.show()
 
+def render_event_switcher(user):
+    # Every db call in this run is scoped to the selected event
+    is_admin = user["role"] == "admin"
+    if is_admin:
+        show_archived = st.sidebar.checkbox("Show archived events", key="show_archived_events")
+        events = get_events(include_archived=show_archived)
+    else:
+        events = get_events_for_judge(user["judge_id"])
+    if not events:
+        set_current_event(None)
+        st.info("You are not assigned to any active event yet.")
+        st.stop()
+
+    ids = [e["id"] for e in events]
+    current = st.session_state.get("event_id")
+    index = ids.index(current) if current in ids else 0
+    labels = {e["id"]: e["name"] + (" (archived)" if e.get("status") == "archived" else "") for e in events}
+    event_id = st.sidebar.selectbox("Event", ids, index=index, format_func=labels.get)
+    st.session_state["event_id"] = event_id
+    set_current_event(event_id)
+    event = events[ids.index(event_id)]
+    if event.get("status") == "archived":
+        st.warning(f"{event['name']} is archived and hidden from judges.")
+
+    if is_admin:
+        render_event_admin(event)
+
+def render_event_admin(event):
+    with st.sidebar.expander("Events"):
+        with st.form("create_event", clear_on_submit=True):
+            name = st.text_input("New event name")
+            if st.form_submit_button("Create event"):
+                if not name.strip():
+                    st.error("Event name is required.")
+                else:
+                    st.session_state["event_id"] = str(create_event(name.strip()))
+                    st.rerun()
+        if event.get("status") == "archived":
+            if st.button("Unarchive this event"):
+                unarchive_event(event["id"])
+                st.rerun()
+        elif st.button("Archive this event"):
+            archive_event(event["id"])
+            st.rerun()
+
+def render_query_profile(profile):
+    summary = profile.summary()
+    label = f"Queries this run: {summary['count']} ({summary['total_ms']:.0f} ms)"
+    with st.sidebar.expander(label, expanded=bool(summary["repeated"])):
+        for item in summary["repeated"]:
+            st.warning(
+                f"Possible N+1: {item['collection']}.{item['op']} ran {item['count']} times "
+                f"with the same shape (threshold {N_PLUS_ONE_THRESHOLD})."
+            )
+            st.code(item["shape"], language=None)
+        if summary["failed"]:
+            st.error(f"{summary['failed']} command(s) failed.")
+        if summary["by_operation"]:
+            st.dataframe(summary["by_operation"], hide_index=True)
+        if summary["reads"]:
+            st.caption("Page reads (run concurrently)")
+            st.dataframe(summary["reads"], hide_index=True)
+
 def apply_background_theme():
     color = get_background_color()
     if not color:
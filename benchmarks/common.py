@@ -0,0 +1,121 @@
+"""
+Shared helpers for the benchmark scripts: point db.py at a scratch database,
+count the commands it sends, and summarize timings.
+
+Benchmarks need a MongoDB they are allowed to wipe, e.g. a local mongod:
+
+    python -m benchmarks.score_writes --uri mongodb://localhost:27017
+
+or the in-process engine (`--backend memory`), which counts its commands the same way.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+
+from pymongo import monitoring
+
+# Commands the driver sends for its own bookkeeping, not on behalf of db.py
+_IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "endSessions", "buildInfo"}
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts round trips per (collection, command) while enabled."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = Counter()
+
+    def reset(self):
+        with self._lock:
+            self.counts = Counter()
+
+    def total(self) -> int:
+        with self._lock:
+            return sum(self.counts.values())
+
+    def started(self, event):
+        if event.command_name in _IGNORED_COMMANDS:
+            return
+        collection = event.command.get(event.command_name)
+        key = f"{collection}.{event.command_name}" if isinstance(collection, str) else event.command_name
+        with self._lock:
+            self.counts[key] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def base_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--backend", choices=["mongo", "memory"], default="mongo")
+    parser.add_argument("--uri", default=os.environ.get("MONGODB_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default="judging_bench", help="Scratch database; it is dropped")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    return parser
+
+
+def connect(args, counter: CommandCounter):
+    """Configure db.py for the scratch database and return (db_module, database)."""
+    os.environ["DATABASE_BACKEND"] = args.backend
+    os.environ["MONGODB_URI"] = args.uri
+    os.environ["MONGODB_DB"] = args.db
+    import db as db_module
+
+    # Must be added before db.py creates its client
+    db_module.COMMAND_LISTENERS.append(counter)
+
+    database = db_module.get_db()
+    reset_database(db_module, database)
+    return db_module, database
+
+
+def reset_database(db_module, database):
+    """Drop the scratch database and re-run the schema migrations on it."""
+    database.client.drop_database(database.name)
+    # The dropped database took its default event with it
+    db_module._default_event.pop(database.name, None)
+    db_module.run_migrations(database)
+
+
+def timed(fn, counter: CommandCounter, repeat: int, setup=None):
+    """
+    Run fn() `repeat` times; return per-call latencies (ms) and mean round trips.
+    With `setup`, each call is fn(setup()) and the setup is neither timed nor counted.
+    """
+    latencies = []
+    trips = 0
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        counter.reset()
+        start = time.perf_counter()
+        fn(arg) if setup else fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+        trips += counter.total()
+    return latencies, trips / max(repeat, 1)
+
+
+def summarize(latencies, round_trips) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "calls": len(ordered),
+        "p50_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "round_trips": round(round_trips, 2),
+    }
+
+
+def emit(report: dict, output: str = None):
+    if output:
+        with open(output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2, default=str)
+        return
+    json.dump(report, sys.stdout, indent=2, default=str)
+    sys.stdout.write("\n")
@@ -0,0 +1,130 @@
+"""
+Synthetic-event benchmark for the db.py hot paths.
+
+For each scale (judges x competitors x questions) a fresh event is seeded,
+with each judge having scored a `--fill` fraction of competitors, then every
+hot path is timed. Output is JSON with p50/p95 latency and round trips per
+call, e.g.:
+
+    python -m benchmarks.event_suite --scales 10x50x5,40x300x8 --fill 0.8
+"""
+import random
+
+from benchmarks.common import CommandCounter, base_parser, connect, emit, reset_database, summarize, timed
+
+
+def parse_scale(text: str) -> dict:
+    judges, competitors, questions = (int(part) for part in text.lower().split("x"))
+    return {"judges": judges, "competitors": competitors, "questions": questions}
+
+
+def seed_judge(db_module, database, judge_oid, competitor_oids, question_oids, fill, rng):
+    """Insert submissions and leaderboard deltas for one judge directly."""
+    event_id = db_module.current_event_id()
+    submissions = []
+    deltas = {}
+    for comp_oid in competitor_oids:
+        if rng.random() >= fill:
+            continue
+        values = {str(qid): rng.randint(1, 10) * 10 for qid in question_oids}
+        avg_value = sum(values.values()) / len(values)
+        submissions.append(
+            {"event_id": event_id, "judge_id": judge_oid, "competitor_id": comp_oid,
+             "answers": values, "question_ids": list(question_oids), "avg": avg_value, "version": 1}
+        )
+        db_module._add_score_delta(deltas, comp_oid, new=avg_value)
+    if submissions:
+        database.submissions.insert_many(submissions)
+    db_module._apply_leaderboard_deltas(database, deltas)
+
+
+def seed_event(db_module, database, scale: dict, fill: float, rng):
+    event_id = db_module.current_event_id()
+    competitor_oids = database.competitors.insert_many(
+        [
+            {"event_id": event_id, "name": f"Team {i:04d}", "name_lc": f"team {i:04d}", "notes": "synthetic"}
+            for i in range(scale["competitors"])
+        ]
+    ).inserted_ids
+    database.leaderboard.insert_many(
+        [db_module._empty_leaderboard_row(oid, f"Team {i:04d}", event_id) for i, oid in enumerate(competitor_oids)]
+    )
+    question_oids = database.questions.insert_many(
+        [{"event_id": event_id, "prompt": f"Criterion {i}"} for i in range(scale["questions"])]
+    ).inserted_ids
+    judge_oids = []
+    for i in range(scale["judges"]):
+        judge_oids.append(
+            db_module.create_judge_account(f"Judge {i}", f"judge{i}@bench.local", f"judge{i}", "bench")
+        )
+    for judge_oid in judge_oids:
+        seed_judge(db_module, database, judge_oid, competitor_oids, question_oids, fill, rng)
+    return judge_oids, list(competitor_oids), list(question_oids)
+
+
+def run_scale(db_module, database, counter, scale: dict, fill: float, repeat: int, rng) -> dict:
+    reset_database(db_module, database)
+    judge_oids, competitor_oids, question_oids = seed_event(db_module, database, scale, fill, rng)
+    extra = iter(range(10**9))
+
+    def random_answers():
+        return (
+            rng.choice(judge_oids),
+            rng.choice(competitor_oids),
+            {qid: rng.randint(1, 10) * 10 for qid in question_oids},
+        )
+
+    def new_question():
+        # A scored question to delete, answered by every pair that has a submission
+        event_id = db_module.current_event_id()
+        qid = database.questions.insert_one({"event_id": event_id, "prompt": f"Extra {next(extra)}"}).inserted_id
+        database.submissions.update_many(
+            {"event_id": event_id},
+            {"$set": {f"answers.{qid}": rng.randint(1, 10) * 10}, "$addToSet": {"question_ids": qid}},
+        )
+        return qid
+
+    def new_judge():
+        n = next(extra)
+        judge_oid = db_module.create_judge_account(f"Extra {n}", f"extra{n}@bench.local", f"extra{n}", "bench")
+        seed_judge(db_module, database, judge_oid, competitor_oids, question_oids, fill, rng)
+        return judge_oid
+
+    operations = {
+        "get_leaderboard": timed(db_module.get_leaderboard, counter, repeat),
+        "get_judges_with_user": timed(db_module.get_judges_with_user, counter, repeat),
+        "save_answers_for_judge": timed(
+            lambda args: db_module.save_answers_for_judge(*args), counter, repeat, setup=random_answers
+        ),
+        "detailed_export": timed(lambda: sum(1 for _ in db_module.iter_detailed_submissions()), counter, repeat),
+        "delete_question": timed(db_module.delete_question, counter, repeat, setup=new_question),
+        "delete_judge_account": timed(db_module.delete_judge_account, counter, repeat, setup=new_judge),
+    }
+    return {
+        "scale": {**scale, "fill": fill, "submissions": database.submissions.count_documents({})},
+        "operations": {name: summarize(*result) for name, result in operations.items()},
+    }
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument("--scales", default="5x20x4,20x100x6,40x300x8",
+                        help="Comma-separated JUDGESxCOMPETITORSxQUESTIONS")
+    parser.add_argument("--fill", type=float, default=0.8, help="Fraction of competitors each judge scored")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    counter = CommandCounter()
+    db_module, database = connect(args, counter)
+    rng = random.Random(args.seed)
+    results = [
+        run_scale(db_module, database, counter, parse_scale(text), args.fill, args.repeat, rng)
+        for text in args.scales.split(",")
+    ]
+    emit({"benchmark": "event_suite", "backend": args.backend, "results": results}, args.output)
+    database.client.drop_database(args.db)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Microbenchmark: score submission write path.
+
+Compares save_answers_for_judge (one submission document per pair) against
+the original delete-then-insert of per-question answer documents, reporting
+latency and round trips per submission.
+"""
+from benchmarks.common import CommandCounter, base_parser, connect, emit, summarize, timed
+
+
+def legacy_save_answers(database, event_id, judge_oid, comp_oid, answers):
+    # Original per-question `answers` + `scores` implementation, kept here only for comparison
+    pair = {"event_id": event_id, "judge_id": judge_oid, "competitor_id": comp_oid}
+    database.answers.delete_many(pair)
+    database.scores.delete_many(pair)
+    database.answers.insert_many([{**pair, "question_id": qid, "value": value} for qid, value in answers.items()])
+    database.scores.insert_one({**pair, "value": sum(answers.values()) / len(answers)})
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument("--questions", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    counter = CommandCounter()
+    db_module, database = connect(args, counter)
+
+    event_id = db_module.current_event_id()
+    judge_oid = database.judges.insert_one(
+        {"name": "Bench judge", "email": "bench@example.com", "event_ids": [event_id]}
+    ).inserted_id
+    comp_oid = database.competitors.insert_one({"event_id": event_id, "name": "Bench team", "notes": ""}).inserted_id
+    database.leaderboard.insert_one(db_module._empty_leaderboard_row(comp_oid, "Bench team", event_id))
+    question_ids = database.questions.insert_many(
+        [{"event_id": event_id, "prompt": f"Q{i}"} for i in range(args.questions)]
+    ).inserted_ids
+
+    round_no = iter(range(10**9))
+
+    def answers():
+        # Vary values so every submission really changes the score
+        n = next(round_no)
+        return {qid: ((n + i) % 10 + 1) * 10 for i, qid in enumerate(question_ids)}
+
+    legacy = timed(lambda: legacy_save_answers(database, event_id, judge_oid, comp_oid, answers()), counter, args.repeat)
+    upsert = timed(lambda: db_module.save_answers_for_judge(judge_oid, comp_oid, answers()), counter, args.repeat)
+
+    emit(
+        {
+            "benchmark": "score_writes",
+            "questions": args.questions,
+            "topology": database.client.topology_description.topology_type_name,
+            "legacy_delete_insert": summarize(*legacy),
+            "submission_upsert": summarize(*upsert),
+        },
+        args.output,
+    )
+    database.client.drop_database(args.db)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,20 @@
+import csv
+import functools
 import hashlib
+import inspect
+import io
 import os
-from typing import Any, Dict, Optional
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
 
 import streamlit as st
 from bson import ObjectId
-from pymongo import ASCENDING, MongoClient
-from pymongo.errors import DuplicateKeyError
+from pymongo import ASCENDING, DESCENDING, DeleteMany, MongoClient, ReplaceOne, ReturnDocument, UpdateOne, monitoring
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
 from bson.binary import Binary
 from datetime import datetime
 
@@ -19,8 +28,8 @@ def _get_mongo_uri() -> str:
     if secret_uri:
         print("Using MongoDB URI from Streamlit secrets.")
         return secret_uri
-    # No valid URI present
-    return None
+    # Scripts outside Streamlit (e.g. benchmarks) can configure via environment
+    return os.environ.get("MONGODB_URI")
 
 
 def _get_db_name() -> str:
@@ -32,28 +41,368 @@ def _get_db_name() -> str:
     if secret_db:
         print("Using MongoDB DB name from Streamlit secrets.")
         return secret_db
-    return None
+    return os.environ.get("MONGODB_DB")
+
+
+def _get_backend() -> str:
+    # "mongo" (default) or "memory" for the in-process engine in memory_db.py
+    try:
+        secret_backend = st.secrets.database.backend  # type: ignore[attr-defined]
+    except Exception:
+        secret_backend = None
+    return (secret_backend or os.environ.get("DATABASE_BACKEND") or "mongo").lower()
+
+
+def _database_secrets() -> Dict[str, Any]:
+    try:
+        return dict(st.secrets.database)  # type: ignore[attr-defined]
+    except Exception:
+        return {}
+
+
+# [database] secret -> MongoClient pool / timeout option
+_CLIENT_OPTIONS = {
+    "max_pool_size": "maxPoolSize",
+    "min_pool_size": "minPoolSize",
+    "max_idle_time_ms": "maxIdleTimeMS",
+    "wait_queue_timeout_ms": "waitQueueTimeoutMS",
+    "connect_timeout_ms": "connectTimeoutMS",
+    "server_selection_timeout_ms": "serverSelectionTimeoutMS",
+    "socket_timeout_ms": "socketTimeoutMS",
+}
+
+
+def _client_options() -> Dict[str, Any]:
+    secrets = _database_secrets()
+    return {option: secrets[key] for key, option in _CLIENT_OPTIONS.items() if key in secrets}
 
 
 @st.cache_resource
 def get_db():
     # Cached Mongo client/db for Streamlit reruns
+    if _get_backend() == "memory":
+        from memory_db import MemoryClient
+
+        return MemoryClient(event_listeners=COMMAND_LISTENERS)[_get_db_name() or "judge_db"]
     uri = _get_mongo_uri()
     db_name = _get_db_name()
     if not uri or not db_name:
         raise RuntimeError("Database configuration missing. See .streamlit/secrets.toml")
-    client = MongoClient(uri)
+    client = MongoClient(uri, event_listeners=COMMAND_LISTENERS, **_client_options())
     return client[db_name]
 
 
 # Module-level helper to let the app check configuration before calling DB functions
 def is_db_configured() -> bool:
     try:
+        if _get_backend() == "memory":
+            return True
         return bool(_get_mongo_uri() and _get_db_name())
     except Exception:
         return False
 
 
+# --- Query profiling ---
+#
+# A command listener on the client records every command issued while a
+# QueryProfile is active on the current thread (one Streamlit script run),
+# so the admin sidebar can show what a rerun cost and flag N+1 patterns.
+
+N_PLUS_ONE_THRESHOLD = 10
+
+# Driver housekeeping, not issued by app code
+_UNPROFILED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "endSessions", "killCursors", "saslStart", "saslContinue"}
+
+_profile_local = threading.local()
+
+
+class QueryProfile:
+    """Commands recorded during one script run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.entries = []
+        self.reads = []
+
+    def record(self, collection: str, op: str, shape: str, ms: float, docs: int, failed: bool):
+        with self._lock:
+            self.entries.append(
+                {"collection": collection, "op": op, "shape": shape, "ms": ms, "docs": docs, "failed": failed}
+            )
+
+    def record_read(self, name: str, ms: float):
+        # One named read of a concurrent page load (see page_data.py)
+        with self._lock:
+            self.reads.append({"Read": name, "Time (ms)": round(ms, 1)})
+
+    def summary(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> Dict[str, Any]:
+        """Totals, per collection/operation rows, and query shapes repeated more than `threshold` times."""
+        with self._lock:
+            entries = list(self.entries)
+            reads = list(self.reads)
+        by_operation: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        shapes: Dict[Tuple[str, str, str], int] = {}
+        for e in entries:
+            row = by_operation.setdefault(
+                (e["collection"], e["op"]),
+                {"Collection": e["collection"], "Operation": e["op"], "Calls": 0, "Time (ms)": 0.0, "Docs": 0},
+            )
+            row["Calls"] += 1
+            row["Time (ms)"] += e["ms"]
+            row["Docs"] += e["docs"]
+            shape_key = (e["collection"], e["op"], e["shape"])
+            shapes[shape_key] = shapes.get(shape_key, 0) + 1
+        rows = sorted(by_operation.values(), key=lambda r: r["Time (ms)"], reverse=True)
+        for row in rows:
+            row["Time (ms)"] = round(row["Time (ms)"], 1)
+        return {
+            "count": len(entries),
+            "total_ms": sum(e["ms"] for e in entries),
+            "failed": sum(1 for e in entries if e["failed"]),
+            "by_operation": rows,
+            "reads": reads,
+            "repeated": [
+                {"collection": c, "op": op, "shape": shape, "count": n}
+                for (c, op, shape), n in shapes.items()
+                if n > threshold
+            ],
+        }
+
+
+def start_query_profile() -> QueryProfile:
+    """Begin recording commands issued by the current thread."""
+    profile = QueryProfile()
+    _profile_local.profile = profile
+    return profile
+
+
+def stop_query_profile():
+    _profile_local.profile = None
+
+
+def get_query_profile() -> Optional[QueryProfile]:
+    return getattr(_profile_local, "profile", None)
+
+
+def set_query_profile(profile: Optional[QueryProfile]):
+    # Lets worker threads record into the profile of the run that started them
+    _profile_local.profile = profile
+
+
+def _query_shape(value) -> Any:
+    # Keys and operators are kept; values become "?" so repeated lookups compare equal
+    if isinstance(value, dict):
+        return {k: _query_shape(v) for k, v in sorted(value.items())}
+    if isinstance(value, list):
+        return [_query_shape(v) for v in value[:1]]
+    return "?"
+
+
+def _describe_command(name: str, command) -> Tuple[str, str]:
+    collection = command.get(name)
+    if not isinstance(collection, str):
+        collection = command.get("collection", "")
+    if name == "aggregate":
+        pipeline = command.get("pipeline") or []
+        shape = [next(iter(stage)) for stage in pipeline]
+        if pipeline and "$match" in pipeline[0]:
+            shape[0] = {"$match": _query_shape(pipeline[0]["$match"])}
+    elif name in ("update", "delete") and isinstance(command.get(name + "s"), list):
+        statements = command[name + "s"]
+        shape = _query_shape(statements[0].get("q") if statements else {})
+    elif name == "insert":
+        shape = "insert"
+    else:
+        spec = command.get("filter", command.get("query", command.get("q")))
+        shape = _query_shape(spec) if spec is not None else name
+    return collection, repr(shape)
+
+
+def _reply_docs(reply) -> int:
+    cursor = reply.get("cursor") if isinstance(reply, dict) else None
+    if cursor:
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", [])))
+    if isinstance(reply, dict) and isinstance(reply.get("n"), int):
+        return reply["n"]
+    return 0
+
+
+class _QueryListener(monitoring.CommandListener):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[Any, Tuple[QueryProfile, str, str]] = {}
+
+    def started(self, event):
+        profile = get_query_profile()
+        if profile is None or event.command_name in _UNPROFILED_COMMANDS:
+            return
+        collection, shape = _describe_command(event.command_name, event.command)
+        with self._lock:
+            self._pending[event.request_id] = (profile, collection, shape)
+
+    def succeeded(self, event):
+        _observe_cluster_time(event.reply)
+        self._finish(event, _reply_docs(event.reply), failed=False)
+
+    def failed(self, event):
+        self._finish(event, 0, failed=True)
+
+    def _finish(self, event, docs: int, failed: bool):
+        with self._lock:
+            pending = self._pending.pop(event.request_id, None)
+        if pending is None:
+            return
+        profile, collection, shape = pending
+        profile.record(collection, event.command_name, shape, event.duration_micros / 1000, docs, failed)
+
+
+_query_listener = _QueryListener()
+
+# Command listeners get_db's client is created with; the benchmarks add their round-trip counter
+COMMAND_LISTENERS: List[monitoring.CommandListener] = [_query_listener]
+
+
+# --- Read routing ---
+#
+# Functions are OLTP by default: they read and write on the primary. Heavy
+# read-only functions are labelled @workload(ANALYTICS) and, on a replica
+# set, read from `analytics_read_preference` (secondaryPreferred unless set
+# in secrets) inside a causally consistent session. The session is advanced
+# to the latest operation time this user has seen (their causal token), so
+# a secondary waits until it has caught up with the user's own writes.
+# Readers fetch their target with _reads() and pass its session along.
+
+OLTP = "oltp"
+ANALYTICS = "analytics"
+WORKLOADS: Dict[str, str] = {}
+
+_READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+_route_local = threading.local()
+
+
+def bind_causal_token(token: Dict[str, Any]):
+    """
+    Track operation times for the current thread in `token` (the app binds one
+    per browser session, so they survive reruns); unbound threads get their own.
+    """
+    _route_local.token = token
+
+
+def causal_token() -> Dict[str, Any]:
+    token = getattr(_route_local, "token", None)
+    if token is None:
+        token = _route_local.token = {}
+    return token
+
+
+def _observe_cluster_time(reply):
+    # Replica set replies carry the operation and cluster time the command observed
+    if not isinstance(reply, dict) or "operationTime" not in reply:
+        return
+    token = causal_token()
+    if token.get("operation_time") is None or reply["operationTime"] > token["operation_time"]:
+        token["operation_time"] = reply["operationTime"]
+    cluster_time = reply.get("$clusterTime")
+    if cluster_time and (
+        token.get("cluster_time") is None or cluster_time["clusterTime"] > token["cluster_time"]["clusterTime"]
+    ):
+        token["cluster_time"] = cluster_time
+
+
+def _analytics_read_preference():
+    secrets = _database_secrets()
+    mode = secrets.get("analytics_read_preference", "secondaryPreferred")
+    staleness = secrets.get("analytics_max_staleness_seconds")
+    if mode == "primary":
+        return Primary()
+    return _READ_PREFERENCES[mode](max_staleness=int(staleness) if staleness else -1)
+
+
+@st.cache_resource
+def get_analytics_db():
+    """get_db() with the analytics read preference."""
+    return get_db().with_options(read_preference=_analytics_read_preference())
+
+
+def _is_replica_set(db) -> bool:
+    return db.client.topology_description.topology_type_name in (
+        "ReplicaSetWithPrimary",
+        "ReplicaSetNoPrimary",
+        "Sharded",
+    )
+
+
+def _reads():
+    """(database, session) to read with: the analytics route inside an ANALYTICS call, else the primary."""
+    route = getattr(_route_local, "route", None)
+    return route if route is not None else (get_db(), None)
+
+
+@contextmanager
+def _routed(route):
+    previous = getattr(_route_local, "route", None)
+    _route_local.route = route
+    try:
+        yield
+    finally:
+        _route_local.route = previous
+
+
+@contextmanager
+def _analytics_route():
+    route = getattr(_route_local, "route", None)
+    db = get_db()
+    if route is not None or not _is_replica_set(db):
+        # Nested in another analytics call, or nothing to route to
+        yield route or (db, None)
+        return
+    token = causal_token()
+    with db.client.start_session(causal_consistency=True) as session:
+        if token.get("cluster_time"):
+            session.advance_cluster_time(token["cluster_time"])
+        if token.get("operation_time"):
+            session.advance_operation_time(token["operation_time"])
+        yield get_analytics_db(), session
+
+
+def workload(label: str):
+    """Label a db function OLTP or ANALYTICS; ANALYTICS calls read through the analytics route."""
+
+    def decorate(fn):
+        WORKLOADS[fn.__name__] = label
+        if label != ANALYTICS:
+            return fn
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def generator(*args, **kwargs):
+                # Route only while the generator runs, not while the caller holds it suspended
+                with _analytics_route() as route:
+                    rows = fn(*args, **kwargs)
+                    while True:
+                        with _routed(route):
+                            try:
+                                row = next(rows)
+                            except StopIteration:
+                                return
+                        yield row
+            return generator
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _analytics_route() as route, _routed(route):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+
 def _oid(value: Any) -> ObjectId:
     if isinstance(value, ObjectId):
         return value
@@ -66,22 +415,247 @@ def _doc_with_id(doc: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     clean = dict(doc)
     clean["id"] = str(clean.pop("_id"))
     # Normalize nested ids if present
-    for key in ("judge_id", "competitor_id", "question_id"):
+    for key in ("judge_id", "competitor_id", "question_id", "event_id"):
         if key in clean and isinstance(clean[key], ObjectId):
             clean[key] = str(clean[key])
+    if isinstance(clean.get("event_ids"), list):
+        clean["event_ids"] = [str(e) for e in clean["event_ids"]]
     return clean
 
 
+# --- Read models ---
+#
+# List and lookup functions return compact records instead of _doc_with_id
+# dicts. A record class names the fields a view needs in __slots__; only
+# those are fetched (projection()), and `id` is converted from the ObjectId
+# only when read. Records also answer record["field"] and record.get(...)
+# so code written against the dicts keeps working.
+
+class ReadModel:
+    __slots__ = ("_oid",)
+    DEFAULTS: Dict[str, Any] = {}
+
+    @classmethod
+    def fields(cls) -> Tuple[str, ...]:
+        return tuple(f for klass in reversed(cls.__mro__) for f in klass.__dict__.get("__slots__", ()) if f != "_oid")
+
+    @classmethod
+    def projection(cls) -> Dict[str, int]:
+        return {field: 1 for field in cls.fields()}
+
+    @classmethod
+    def from_doc(cls, doc: Optional[Dict[str, Any]]):
+        if not doc:
+            return None
+        record = cls.__new__(cls)
+        record._oid = doc["_id"]
+        for field in cls.fields():
+            setattr(record, field, doc.get(field, cls.DEFAULTS.get(field)))
+        return record
+
+    @property
+    def id(self) -> str:
+        return str(self._oid)
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def __repr__(self):
+        values = ", ".join(f"{f}={getattr(self, f)!r}" for f in self.fields())
+        return f"{type(self).__name__}(id={self.id!r}, {values})"
+
+
+class CompetitorOption(ReadModel):
+    """What judges see of a competitor; notes are admin-only."""
+    __slots__ = ("name",)
+
+
+class Competitor(CompetitorOption):
+    __slots__ = ("notes",)
+    DEFAULTS = {"notes": ""}
+
+
+class Question(ReadModel):
+    __slots__ = ("prompt",)
+
+
+class Judge(ReadModel):
+    # username is filled in from `users` by _with_usernames
+    __slots__ = ("name", "email", "username")
+
+
+class JudgeVersion(ReadModel):
+    """Just enough of a judge to validate a session answer cache."""
+    __slots__ = ("answers_version",)
+    DEFAULTS = {"answers_version": 0}
+
+
+def _records(model: Type[ReadModel], rows) -> list:
+    return [model.from_doc(row) for row in rows]
+
+
+# --- Events ---
+#
+# Each competition is an event. Event-owned documents (competitors, questions,
+# submissions, leaderboard rows, assets) carry `event_id`, and judges carry
+# `event_ids` so one judge can serve several events. Every query filters on the
+# current event, which the app sets for each script run with set_current_event;
+# code running without one (scripts, migrations) gets the default event.
+
+_event_local = threading.local()
+_default_event: Dict[str, ObjectId] = {}
+
+
+def set_current_event(event_id: Any):
+    """Scope db calls on the current thread to `event_id` (None for the default event)."""
+    _event_local.event_id = _oid(event_id) if event_id else None
+
+
+def current_event_id() -> ObjectId:
+    event_id = getattr(_event_local, "event_id", None)
+    return event_id if event_id is not None else default_event_id()
+
+
+def default_event_id() -> ObjectId:
+    """The event that pre-event data belongs to."""
+    return _default_event_id(get_db())
+
+
+def _scoped(query: Optional[Dict[str, Any]] = None, event_id: Optional[ObjectId] = None) -> Dict[str, Any]:
+    return {"event_id": event_id if event_id is not None else current_event_id(), **(query or {})}
+
+
+def _default_event_id(db) -> ObjectId:
+    """The event that pre-event data belongs to; created on first use."""
+    if db.name in _default_event:
+        return _default_event[db.name]
+    row = db["_meta"].find_one({"_id": "default_event"})
+    if row:
+        event_id = row["event_id"]
+    else:
+        event_id = db.events.insert_one(
+            {"name": "Default event", "status": "active", "created_at": datetime.utcnow()}
+        ).inserted_id
+        try:
+            db["_meta"].insert_one({"_id": "default_event", "event_id": event_id})
+        except DuplicateKeyError:
+            # Another process created it first
+            db.events.delete_one({"_id": event_id})
+            event_id = db["_meta"].find_one({"_id": "default_event"})["event_id"]
+    _default_event[db.name] = event_id
+    return event_id
+
+
+def get_events(include_archived: bool = False):
+    db = get_db()
+    query = {} if include_archived else {"status": "active"}
+    return [_doc_with_id(r) for r in db.events.find(query).sort("_id", ASCENDING)]
+
+
+def get_event(event_id: Any):
+    return _doc_with_id(get_db().events.find_one({"_id": _oid(event_id)}))
+
+
+def get_events_for_judge(judge_id: Any):
+    """Active events the judge is a member of."""
+    db = get_db()
+    judge = db.judges.find_one({"_id": _oid(judge_id)}, {"event_ids": 1})
+    if not judge:
+        return []
+    rows = db.events.find({"_id": {"$in": judge.get("event_ids", [])}, "status": "active"}).sort("_id", ASCENDING)
+    return [_doc_with_id(r) for r in rows]
+
+
+def create_event(name: str) -> ObjectId:
+    db = get_db()
+    return db.events.insert_one({"name": name, "status": "active", "created_at": datetime.utcnow()}).inserted_id
+
+
+def archive_event(event_id: Any):
+    """Mark a finished event archived: hidden from judges, kept read-only for admins."""
+    get_db().events.update_one(
+        {"_id": _oid(event_id)}, {"$set": {"status": "archived", "archived_at": datetime.utcnow()}}
+    )
+
+
+def unarchive_event(event_id: Any):
+    get_db().events.update_one({"_id": _oid(event_id)}, {"$set": {"status": "active"}, "$unset": {"archived_at": ""}})
+
+
 def init_db():
     """
-    Create indexes and seed default admin.
+    Bring the schema up to date and seed default admin, once per process.
     """
     if not is_db_configured():
         st.error(
             "Database configuration missing. Create a .streamlit/secrets.toml with [database] uri and name. Login is disabled until configured."
         )
         return
+    _ensure_schema()
+
+
+@st.cache_resource
+def _ensure_schema():
+    # Cached so Streamlit reruns skip all DDL; a failure is not cached and retries
     db = get_db()
+    applied = run_migrations(db)
+    create_default_admin_if_missing(db)
+    return applied
+
+
+# --- Schema migrations ---
+#
+# Each schema change is a numbered migration registered with @migration.
+# Applied versions are recorded in `_meta`, so a migration runs once per
+# database; add new ones with the next version number, never edit old ones.
+
+MIGRATIONS = []
+
+
+def migration(version: int, description: str):
+    def register(fn):
+        MIGRATIONS.append((version, description, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return register
+
+
+def get_applied_migrations(db) -> set:
+    return {row["version"] for row in db["_meta"].find({"type": "migration"}, {"version": 1})}
+
+
+def run_migrations(db):
+    """Apply pending migrations in version order. Returns the versions applied."""
+    applied = get_applied_migrations(db)
+    ran = []
+    for version, description, fn in MIGRATIONS:
+        if version in applied:
+            continue
+        fn(db)
+        db["_meta"].update_one(
+            {"_id": f"migration:{version}"},
+            {
+                "$set": {
+                    "type": "migration",
+                    "version": version,
+                    "description": description,
+                    "applied_at": datetime.utcnow(),
+                }
+            },
+            upsert=True,
+        )
+        ran.append(version)
+    return ran
+
+
+@migration(1, "Base unique indexes")
+def _migration_base_indexes(db):
     db.judges.create_index("email", unique=True)
     db.users.create_index("username", unique=True)
     db.users.create_index("judge_id", unique=True, sparse=True)
@@ -92,31 +666,242 @@ def init_db():
         [("judge_id", ASCENDING), ("competitor_id", ASCENDING), ("question_id", ASCENDING)],
         unique=True,
     )
-    create_default_admin_if_missing(db)
+
+
+@migration(2, "Materialized leaderboard")
+def _migration_leaderboard(db):
+    db.leaderboard.create_index([("avg_score", DESCENDING), ("_id", ASCENDING)])
+    rebuild_leaderboard(db)
+
+
+@migration(3, "Content-addressed banner variants")
+def _migration_banner_variants(db):
+    row = db.assets.find_one({"key": "banner"})
+    if row and row.get("data") is not None and not row.get("hash"):
+        # Updated in place by _id: save_banner_image is event-scoped and this banner
+        # predates events (migration 6 stamps it and its variants)
+        data = bytes(row["data"])
+        digest = hashlib.sha256(data).hexdigest()
+        variants = _render_banner_variants(data)
+        if variants:
+            db.assets.insert_many(_banner_variant_docs(digest, variants))
+        db.assets.update_one(
+            {"_id": row["_id"]}, {"$set": {"hash": digest, "variant_widths": [width for width, _ in variants]}}
+        )
+
+
+@migration(4, "Indexes for single-field deletes, lookups and asset keys")
+def _migration_secondary_indexes(db):
+    # scores/answers by competitor: delete_competitor and the leaderboard $lookup
+    db.scores.create_index("competitor_id")
+    db.answers.create_index("competitor_id")
+    # answers by question: delete_question
+    db.answers.create_index("question_id")
+    db.users.create_index("role")
+    db.assets.create_index([("key", ASCENDING), ("hash", ASCENDING), ("width", ASCENDING)])
+    db["_meta"].create_index("type")
+
+
+@migration(5, "Lowercased search fields for admin lists")
+def _migration_search_fields(db):
+    db.competitors.update_many({}, [{"$set": {"name_lc": {"$toLower": "$name"}}}])
+    db.judges.update_many(
+        {}, [{"$set": {"name_lc": {"$toLower": "$name"}, "email_lc": {"$toLower": "$email"}}}]
+    )
+    db.competitors.create_index("name_lc")
+    db.judges.create_index("name_lc")
+    db.judges.create_index("email_lc")
+
+
+@migration(6, "Events: scope documents by event_id")
+def _migration_events(db):
+    # Existing data becomes the default event; indexes then lead with the event
+    event_id = _default_event_id(db)
+    for name in ("competitors", "questions", "answers", "scores", "leaderboard", "assets"):
+        db[name].update_many({"event_id": {"$exists": False}}, {"$set": {"event_id": event_id}})
+    db.judges.update_many({"event_ids": {"$exists": False}}, {"$set": {"event_ids": [event_id]}})
+
+    db.events.create_index([("status", ASCENDING), ("_id", ASCENDING)])
+    db.competitors.create_index([("event_id", ASCENDING), ("_id", ASCENDING)])
+    db.competitors.create_index([("event_id", ASCENDING), ("name_lc", ASCENDING)])
+    db.questions.create_index([("event_id", ASCENDING), ("_id", ASCENDING)])
+    db.judges.create_index([("event_ids", ASCENDING), ("_id", ASCENDING)])
+    db.judges.create_index([("event_ids", ASCENDING), ("name_lc", ASCENDING)])
+    db.judges.create_index([("event_ids", ASCENDING), ("email_lc", ASCENDING)])
+    db.answers.create_index(
+        [("event_id", ASCENDING), ("judge_id", ASCENDING), ("competitor_id", ASCENDING), ("question_id", ASCENDING)],
+        unique=True,
+    )
+    db.answers.create_index([("event_id", ASCENDING), ("competitor_id", ASCENDING)])
+    db.answers.create_index([("event_id", ASCENDING), ("question_id", ASCENDING)])
+    db.scores.create_index(
+        [("event_id", ASCENDING), ("judge_id", ASCENDING), ("competitor_id", ASCENDING)], unique=True
+    )
+    db.scores.create_index([("event_id", ASCENDING), ("competitor_id", ASCENDING)])
+    db.leaderboard.create_index([("event_id", ASCENDING), ("avg_score", DESCENDING), ("_id", ASCENDING)])
+    db.assets.create_index([("event_id", ASCENDING), ("key", ASCENDING), ("hash", ASCENDING), ("width", ASCENDING)])
+
+    # The event-leading indexes above cover everything these served
+    for collection, index in (
+        ("competitors", "name_lc_1"),
+        ("judges", "name_lc_1"),
+        ("judges", "email_lc_1"),
+        ("answers", "judge_id_1_competitor_id_1_question_id_1"),
+        ("answers", "competitor_id_1"),
+        ("answers", "question_id_1"),
+        ("scores", "judge_id_1_competitor_id_1"),
+        ("scores", "competitor_id_1"),
+        ("leaderboard", "avg_score_-1__id_1"),
+        ("assets", "key_1_hash_1_width_1"),
+    ):
+        if index in db[collection].index_information():
+            db[collection].drop_index(index)
+    # Migration 2 ran before scores were stamped with the event
+    rebuild_leaderboard(db)
+
+
+@migration(7, "Submissions: one document per judge x competitor")
+def _migration_submissions(db):
+    # Per-question `answers` and the per-pair `scores` they were averaged into
+    # become one `submissions` document per pair: {question id: value}, avg, version
+    pair_key = ["event_id", "judge_id", "competitor_id"]
+    db.submissions.create_index([(field, ASCENDING) for field in pair_key], unique=True)
+    db.submissions.create_index([("event_id", ASCENDING), ("competitor_id", ASCENDING)])
+    db.answers.aggregate(
+        [
+            {
+                "$group": {
+                    "_id": {field: f"${field}" for field in pair_key},
+                    "answers": {"$push": {"k": {"$toString": "$question_id"}, "v": "$value"}},
+                    "avg": {"$avg": "$value"},
+                }
+            },
+            {
+                "$project": {
+                    "_id": 0,
+                    **{field: f"$_id.{field}" for field in pair_key},
+                    "answers": {"$arrayToObject": "$answers"},
+                    "avg": 1,
+                    "version": {"$literal": 1},
+                }
+            },
+            {"$merge": {"into": "submissions", "on": pair_key, "whenMatched": "merge", "whenNotMatched": "insert"}},
+        ]
+    )
+    # Stored scores win over recomputed averages, so leaderboard totals stay as they were
+    db.scores.aggregate(
+        [
+            {
+                "$project": {
+                    "_id": 0,
+                    **{field: 1 for field in pair_key},
+                    "avg": "$value",
+                    "version": {"$literal": 1},
+                }
+            },
+            {"$merge": {"into": "submissions", "on": pair_key, "whenMatched": "merge", "whenNotMatched": "insert"}},
+        ]
+    )
+    db.submissions.update_many({"answers": {"$exists": False}}, {"$set": {"answers": {}}})
+    db.answers.drop()
+    db.scores.drop()
+    # Earlier migrations may have rebuilt from the collections just dropped
+    rebuild_leaderboard(db)
+
+
+@migration(8, "Submissions: indexed list of answered questions")
+def _migration_submission_question_ids(db):
+    # `answers` keys cannot be indexed per question, so mirror them in an array
+    ops = [
+        UpdateOne({"_id": row["_id"]}, {"$set": {"question_ids": [ObjectId(qid) for qid in row["answers"]]}})
+        for row in db.submissions.find({"question_ids": {"$exists": False}}, {"answers": 1})
+    ]
+    if ops:
+        db.submissions.bulk_write(ops, ordered=False)
+    db.submissions.create_index([("event_id", ASCENDING), ("question_ids", ASCENDING)])
 
 
 # --- CRUD operations ---
 
+ADMIN_PAGE_SIZE = 25
+
+
+def _prefix_regex(search: str) -> Dict[str, str]:
+    # Anchored, case-folded prefix so the *_lc index bounds the scan
+    return {"$regex": "^" + re.escape(search.strip().lower())}
+
+
+def _paged(collection, query: Dict[str, Any], page: int, page_size: int, model: Type[ReadModel]):
+    """Return (records, total) for one page of `query` in _id order."""
+    total = collection.count_documents(query)
+    rows = collection.find(query, model.projection()).sort("_id", ASCENDING).skip(max(page, 0) * page_size)
+    return _records(model, rows.limit(page_size)), total
+
+
+def _judges_query(event_id: Optional[ObjectId] = None) -> Dict[str, Any]:
+    return {"event_ids": event_id if event_id is not None else current_event_id()}
+
+
 def get_judges():
     db = get_db()
-    rows = db.judges.find().sort("_id", ASCENDING)
-    return [_doc_with_id(r) for r in rows]
+    rows = db.judges.find(_judges_query(), Judge.projection()).sort("_id", ASCENDING)
+    return _records(Judge, rows)
 
 
 def get_judges_with_user():
+    db, session = _reads()
+    rows = db.judges.find(_judges_query(), Judge.projection(), session=session).sort("_id", ASCENDING)
+    return _with_usernames(db, _records(Judge, rows), session)
+
+
+def _with_usernames(db, judges, session=None):
+    # One bulk lookup for all linked users instead of a find_one per judge
+    usernames = {
+        row["judge_id"]: row["username"]
+        for row in db.users.find(
+            {"judge_id": {"$in": [j._oid for j in judges]}, "role": "judge"},
+            {"judge_id": 1, "username": 1},
+            session=session,
+        )
+    }
+    for judge in judges:
+        judge.username = usernames.get(judge._oid)
+    return judges
+
+
+def get_judges_with_user_page(search: str = "", page: int = 0, page_size: int = ADMIN_PAGE_SIZE):
+    """One page of judges (with usernames) whose name or email starts with `search`; returns (rows, total)."""
     db = get_db()
-    results = []
-    for judge in db.judges.find().sort("_id", ASCENDING):
-        linked_user = db.users.find_one({"judge_id": judge["_id"], "role": "judge"})
-        merged = _doc_with_id(judge)
-        merged["username"] = linked_user["username"] if linked_user else None
-        results.append(merged)
-    return results
+    query = _judges_query()
+    if search.strip():
+        prefix = _prefix_regex(search)
+        query["$or"] = [{"name_lc": prefix}, {"email_lc": prefix}]
+    judges, total = _paged(db.judges, query, page, page_size, Judge)
+    return _with_usernames(db, judges), total
+
+
+def get_judges_outside_event():
+    """Judges of other events who could be added to the current one."""
+    db = get_db()
+    rows = db.judges.find({"event_ids": {"$ne": current_event_id()}}, Judge.projection()).sort("_id", ASCENDING)
+    return _records(Judge, rows)
+
+
+def add_judges_to_event(judge_ids: Iterable[Any]):
+    db = get_db()
+    db.judges.update_many(
+        {"_id": {"$in": [_oid(j) for j in judge_ids]}}, {"$addToSet": {"event_ids": current_event_id()}}
+    )
 
 
 def insert_judge(name: str, email: str):
     db = get_db()
-    db.judges.insert_one({"name": name, "email": email})
+    db.judges.insert_one({**_judge_fields(name, email), "event_ids": [current_event_id()]})
+
+
+def _judge_fields(name: str, email: str) -> Dict[str, Any]:
+    # Lowercased copies back the indexed prefix search on admin lists
+    return {"name": name, "email": email, "name_lc": name.lower(), "email_lc": email.lower()}
 
 
 def create_judge_account(name: str, email: str, username: str, password: str):
@@ -124,7 +909,7 @@ def create_judge_account(name: str, email: str, username: str, password: str):
     Create judge record and associated user account.
     """
     db = get_db()
-    result = db.judges.insert_one({"name": name, "email": email})
+    result = db.judges.insert_one({**_judge_fields(name, email), "event_ids": [current_event_id()]})
     judge_id = result.inserted_id
     try:
         db.users.insert_one(
@@ -142,10 +927,10 @@ def create_judge_account(name: str, email: str, username: str, password: str):
     return judge_id
 
 
-def get_judge_by_id(judge_id: Any):
+def get_judge_by_id(judge_id: Any, model: Type[ReadModel] = Judge):
     db = get_db()
-    row = db.judges.find_one({"_id": _oid(judge_id)})
-    return _doc_with_id(row)
+    row = db.judges.find_one({"_id": _oid(judge_id)}, model.projection())
+    return model.from_doc(row)
 
 
 def update_judge_account(
@@ -153,7 +938,7 @@ def update_judge_account(
 ):
     db = get_db()
     judge_oid = _oid(judge_id)
-    db.judges.update_one({"_id": judge_oid}, {"$set": {"name": name, "email": email}})
+    db.judges.update_one({"_id": judge_oid}, {"$set": _judge_fields(name, email)})
     update_fields: Dict[str, Any] = {"username": username}
     if password:
         update_fields["password_hash"] = hash_password(password)
@@ -165,125 +950,238 @@ def update_judge_account(
 
 
 def delete_judge_account(judge_id: Any):
+    """
+    Remove a judge and their scores from the current event. The judge and their
+    login are deleted once they belong to no event.
+    """
     db = get_db()
     judge_oid = _oid(judge_id)
-    db.scores.delete_many({"judge_id": judge_oid})
-    db.answers.delete_many({"judge_id": judge_oid})
-    db.users.delete_many({"judge_id": judge_oid})
-    db.judges.delete_one({"_id": judge_oid})
-
-
-def get_competitors():
+    event_id = current_event_id()
+    judge_scores = _scoped({"judge_id": judge_oid}, event_id)
+
+    def write(session):
+        if session is None:
+            # No transaction to tie a snapshot to the delete, so recompute the rows instead.
+            # Only the pairs read are deleted; a save landing in between stays counted.
+            competitor_oids = db.submissions.distinct("competitor_id", judge_scores)
+            db.submissions.delete_many({**judge_scores, "competitor_id": {"$in": competitor_oids}})
+            _refresh_leaderboard_rows(db, event_id, competitor_oids)
+            return
+        deltas: Dict[ObjectId, list] = {}
+        for row in db.submissions.find(judge_scores, {"competitor_id": 1, "avg": 1}, session=session):
+            _add_score_delta(deltas, row["competitor_id"], old=row["avg"])
+        db.submissions.delete_many(judge_scores, session=session)
+        _apply_leaderboard_deltas(db, deltas, session=session)
+
+    _write_transaction(db, write)
+    _bump_score_epoch(db)
+    db.judges.update_one({"_id": judge_oid}, {"$pull": {"event_ids": event_id}})
+    if db.judges.delete_one({"_id": judge_oid, "event_ids": {"$size": 0}}).deleted_count:
+        db.users.delete_many({"judge_id": judge_oid})
+
+
+def get_competitors(model: Type[ReadModel] = CompetitorOption):
+    """The current event's competitors as `model` records (Competitor for admin views, which include notes)."""
+    db, session = _reads()
+    rows = db.competitors.find(_scoped(), model.projection(), session=session).sort("_id", ASCENDING)
+    return _records(model, rows)
+
+
+def get_competitors_page(search: str = "", page: int = 0, page_size: int = ADMIN_PAGE_SIZE):
+    """One page of competitors whose name starts with `search`; returns (rows, total)."""
     db = get_db()
-    rows = db.competitors.find().sort("_id", ASCENDING)
-    return [_doc_with_id(r) for r in rows]
+    query = _scoped({"name_lc": _prefix_regex(search)} if search.strip() else None)
+    return _paged(db.competitors, query, page, page_size, Competitor)
 
 
 def insert_competitor(name: str, notes: str = ""):
     db = get_db()
-    db.competitors.insert_one({"name": name, "notes": notes})
+    event_id = current_event_id()
+    result = db.competitors.insert_one({"event_id": event_id, "name": name, "name_lc": name.lower(), "notes": notes})
+    db.leaderboard.insert_one(_empty_leaderboard_row(result.inserted_id, name, event_id))
+    _bump_score_epoch(db)
 
 
 def update_competitor(competitor_id: Any, name: str, notes: Optional[str] = None):
     db = get_db()
-    update_fields: Dict[str, Any] = {"name": name}
+    update_fields: Dict[str, Any] = {"name": name, "name_lc": name.lower()}
     if notes is not None:
         update_fields["notes"] = notes
-    db.competitors.update_one({"_id": _oid(competitor_id)}, {"$set": update_fields})
+    comp_oid = _oid(competitor_id)
+    db.competitors.update_one({"_id": comp_oid}, {"$set": update_fields})
+    db.leaderboard.update_one({"_id": comp_oid}, {"$set": {"name": name}})
+    _bump_score_epoch(db)
 
 def delete_competitor(competitor_id: Any):
     db = get_db()
     comp_oid = _oid(competitor_id)
-    db.scores.delete_many({"competitor_id": comp_oid})
-    db.answers.delete_many({"competitor_id": comp_oid})
+    judge_oids = db.submissions.distinct("judge_id", _scoped({"competitor_id": comp_oid}))
+    db.submissions.delete_many(_scoped({"competitor_id": comp_oid}))
+    _bump_answers_version(db, judge_oids)
+    db.leaderboard.delete_one({"_id": comp_oid})
+    _bump_score_epoch(db)
     db.competitors.delete_one({"_id": comp_oid})
 
 
+def _write_transaction(db, fn):
+    """
+    Run fn(session) inside a transaction when the deployment supports one
+    (replica set or sharded cluster); otherwise run it with session=None.
+    """
+    client = db.client
+    if client.topology_description.topology_type_name in ("ReplicaSetWithPrimary", "Sharded"):
+        with client.start_session() as session:
+            return session.with_transaction(fn)
+    return fn(None)
+
+
 def replace_scores_for_judge(judge_id, scores_dict):
     # Replace all scores for a judge
     db = get_db()
     judge_oid = _oid(judge_id)
-    db.scores.delete_many({"judge_id": judge_oid})
-    for competitor_id, value in scores_dict.items():
-        db.scores.insert_one(
-            {"judge_id": judge_oid, "competitor_id": _oid(competitor_id), "value": value}
-        )
+    event_id = current_event_id()
+    new_scores = {_oid(cid): value for cid, value in scores_dict.items()}
+
+    def write(session):
+        deltas: Dict[ObjectId, list] = {}
+        judge_scores = _scoped({"judge_id": judge_oid}, event_id)
+        for row in db.submissions.find(judge_scores, {"competitor_id": 1, "avg": 1}, session=session):
+            _add_score_delta(deltas, row["competitor_id"], old=row["avg"])
+        ops = [DeleteMany({**judge_scores, "competitor_id": {"$nin": list(new_scores)}})]
+        for comp_oid, value in new_scores.items():
+            ops.append(
+                UpdateOne(
+                    {**judge_scores, "competitor_id": comp_oid},
+                    # A score without answers: clear them, or a later re-average would undo it
+                    {
+                        "$set": {"avg": value, "answers": {}, "question_ids": [], "updated_at": datetime.utcnow()},
+                        "$inc": {"version": 1},
+                    },
+                    upsert=True,
+                )
+            )
+            _add_score_delta(deltas, comp_oid, new=value)
+        db.submissions.bulk_write(ops, session=session)
+        _apply_leaderboard_deltas(db, deltas, session=session)
+        _bump_answers_version(db, [judge_oid], session=session)
+
+    _write_transaction(db, write)
+    _bump_score_epoch(db)
 
 
-def save_answers_for_judge(judge_id: Any, competitor_id: Any, answers_dict: Dict[Any, float]):
-    # Save per-question answers and aggregate into scores collection
+def save_answers_for_judge(
+    judge_id: Any, competitor_id: Any, answers_dict: Dict[Any, float], cache: Optional[Dict[str, Any]] = None
+):
+    # Save the pair's answers and their average as one submission document.
+    # One upsert keyed by the unique index, so answers and score never disagree.
+    # Pass the session's answer cache (see get_judge_answers) to update it in place.
     db = get_db()
     judge_oid = _oid(judge_id)
     comp_oid = _oid(competitor_id)
+    event_id = current_event_id()
+    pair = {"event_id": event_id, "judge_id": judge_oid, "competitor_id": comp_oid}
+    answers = {_oid(qid): value for qid, value in answers_dict.items()}
+
+    def write(session):
+        deltas: Dict[ObjectId, list] = {}
+        _add_score_delta(deltas, comp_oid, *_write_submission(db, pair, answers, session))
+        _apply_leaderboard_deltas(db, deltas, session=session)
+        stamp = db.judges.find_one_and_update(
+            {"_id": judge_oid},
+            {"$inc": {"answers_version": 1}},
+            projection={"answers_version": 1},
+            return_document=ReturnDocument.AFTER,
+            session=session,
+        )
+        return stamp["answers_version"] if stamp else None
 
-    db.answers.delete_many({"judge_id": judge_oid, "competitor_id": comp_oid})
-    db.scores.delete_many({"judge_id": judge_oid, "competitor_id": comp_oid})
+    version = _write_transaction(db, write)
+    _bump_score_epoch(db)
+    if cache is None:
+        return
+    if (
+        version is not None
+        and cache.get("judge_id") == str(judge_oid)
+        and cache.get("event_id") == str(event_id)
+        and cache.get("version") == version - 1
+    ):
+        # Nobody else wrote in between, so patching our copy keeps it exact
+        cache["answers"][str(comp_oid)] = {str(qid): value for qid, value in answers.items()}
+        cache["version"] = version
+    else:
+        cache.clear()
 
-    if answers_dict:
-        payload = []
-        for question_id, value in answers_dict.items():
-            payload.append(
-                {
-                    "judge_id": judge_oid,
-                    "competitor_id": comp_oid,
-                    "question_id": _oid(question_id),
-                    "value": value,
-                }
-            )
-        if payload:
-            db.answers.insert_many(payload)
 
-        avg_value = sum(answers_dict.values()) / len(answers_dict)
-        db.scores.insert_one(
-            {"judge_id": judge_oid, "competitor_id": comp_oid, "value": avg_value}
-        )
-    else:
-        # No answers, ensure scores entry is removed
-        db.scores.delete_many({"judge_id": judge_oid, "competitor_id": comp_oid})
+def _write_submission(
+    db, pair: Dict[str, Any], answers: Dict[ObjectId, float], session=None
+) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Store one pair's answers (removing the submission when there are none) and
+    return its (old, new) average. The old value comes from the same atomic
+    findAndModify, so a concurrent save of the pair is never counted twice.
+    """
+    if not answers:
+        previous = db.submissions.find_one_and_delete(pair, projection={"avg": 1}, session=session)
+        return (previous["avg"] if previous else None), None
+    avg_value = sum(answers.values()) / len(answers)
+    # The whole map is replaced, so questions no longer answered drop out
+    update = {
+        "$set": {
+            "answers": {str(qid): value for qid, value in answers.items()},
+            "question_ids": list(answers),
+            "avg": avg_value,
+            "updated_at": datetime.utcnow(),
+        },
+        "$inc": {"version": 1},
+    }
+    previous = db.submissions.find_one_and_update(pair, update, projection={"avg": 1}, upsert=True, session=session)
+    return (previous["avg"] if previous else None), avg_value
+
+
+def save_answers_batch(submissions: Dict[Tuple[Any, Any, Any], Dict[Any, float]]):
+    """
+    Write many submissions at once; `submissions` maps (event_id, judge_id,
+    competitor_id) to an answers dict as passed to save_answers_for_judge. Each
+    submission is its own atomic write; leaderboard deltas and answer versions
+    are written once per event. Used by the write-behind queue.
+    """
+    by_event: Dict[ObjectId, Dict[Tuple[ObjectId, ObjectId], Dict[ObjectId, float]]] = {}
+    for (event_id, judge_id, competitor_id), answers in submissions.items():
+        by_event.setdefault(_oid(event_id), {})[(_oid(judge_id), _oid(competitor_id))] = {
+            _oid(qid): value for qid, value in answers.items()
+        }
+    for event_id, batch in by_event.items():
+        _save_event_batch(get_db(), event_id, batch)
+    if by_event:
+        _bump_score_epoch(get_db())
+
+
+def _save_event_batch(db, event_id: ObjectId, batch: Dict[Tuple[ObjectId, ObjectId], Dict[ObjectId, float]]):
+    def write(session):
+        deltas: Dict[ObjectId, list] = {}
+        for (judge_oid, comp_oid), answers in batch.items():
+            pair = {"event_id": event_id, "judge_id": judge_oid, "competitor_id": comp_oid}
+            # Not one bulk write: without a transaction, a snapshot taken before it
+            # could miss a concurrent save and count it twice
+            _add_score_delta(deltas, comp_oid, *_write_submission(db, pair, answers, session))
+        _apply_leaderboard_deltas(db, deltas, session=session)
+        _bump_answers_version(db, {judge_oid for judge_oid, _ in batch}, session=session)
+
+    _write_transaction(db, write)
 
 
 def get_scores_for_judge(judge_id: Any):
     db = get_db()
     judge_oid = _oid(judge_id)
-    rows = db.scores.find({"judge_id": judge_oid})
-    return {str(row["competitor_id"]): row["value"] for row in rows}
+    rows = db.submissions.find(_scoped({"judge_id": judge_oid}), {"competitor_id": 1, "avg": 1})
+    return {str(row["competitor_id"]): row["avg"] for row in rows}
 
 
+@workload(ANALYTICS)
 def get_leaderboard():
-    db = get_db()
-    pipeline = [
-        {
-            "$lookup": {
-                "from": "scores",
-                "localField": "_id",
-                "foreignField": "competitor_id",
-                "as": "score_docs",
-            }
-        },
-        {
-            "$addFields": {
-                "num_scores": {"$size": "$score_docs"},
-                "total_score": {"$sum": "$score_docs.value"},
-                "avg_score": {
-                    "$cond": [
-                        {"$gt": [{"$size": "$score_docs"}, 0]},
-                        {"$avg": "$score_docs.value"},
-                        0,
-                    ]
-                },
-            }
-        },
-        {
-            "$project": {
-                "name": 1,
-                "num_scores": 1,
-                "total_score": 1,
-                "avg_score": 1,
-            }
-        },
-        {"$sort": {"avg_score": -1}},
-    ]
-    rows = db.competitors.aggregate(pipeline)
+    """Read the materialized leaderboard, best average first."""
+    db, session = _reads()
+    rows = db.leaderboard.find(_scoped(), session=session).sort([("avg_score", DESCENDING), ("_id", ASCENDING)])
     results = []
     for row in rows:
         base = _doc_with_id(row)
@@ -293,24 +1191,397 @@ def get_leaderboard():
     return results
 
 
+def get_leaderboard_with_pending(pending: Dict[Tuple[Any, Any], Dict[Any, float]]):
+    """
+    get_leaderboard() with submissions that are not stored yet applied on top;
+    `pending` maps (judge_id, competitor_id) in the current event to answers.
+    """
+    rows = get_leaderboard()
+    if not pending:
+        return rows
+    pairs = {(_oid(j), _oid(c)): answers for (j, c), answers in pending.items()}
+    stored = _score_snapshot(get_db(), pairs, current_event_id())
+    deltas: Dict[ObjectId, list] = {}
+    for pair, answers in pairs.items():
+        new = sum(answers.values()) / len(answers) if answers else None
+        _add_score_delta(deltas, pair[1], old=stored.get(pair), new=new)
+    for row in rows:
+        total_delta, count_delta = deltas.get(_oid(row["competitor_id"]), (0, 0))
+        row["total_score"] += total_delta
+        row["num_scores"] += count_delta
+        if row["num_scores"] > 0:
+            row["avg_score"] = round(row["total_score"] / row["num_scores"], 6)
+        else:
+            row["total_score"], row["avg_score"] = 0, 0
+    rows.sort(key=lambda row: -row["avg_score"])
+    return rows
+
+
+def get_ranked_leaderboard():
+    """
+    get_leaderboard() rows with a dense "rank" (tied averages share a rank), cached
+    per process until the score epoch moves. Shared across sessions: treat as read-only.
+    """
+    return cached_for_epoch(f"leaderboard:{current_event_id()}", lambda: rank_leaderboard(get_leaderboard()))
+
+
+def rank_leaderboard(rows):
+    """Add a dense "rank" to rows already sorted best average first."""
+    prev_avg = None
+    current_rank = 0
+    for row in rows:
+        avg = row.get("avg_score", 0)
+        if prev_avg is None:
+            current_rank = 1
+        elif avg != prev_avg:
+            current_rank += 1
+        row["rank"] = current_rank
+        prev_avg = avg
+    return rows
+
+
+# --- Score epoch ---
+#
+# Every write that can change standings bumps a counter in `_meta`. Ranked
+# leaderboards are cached per process under the epoch they were built at, so
+# any number of polling screens cost one small read while nothing changes.
+
+_epoch_lock = threading.Lock()
+_epoch_cache: Dict[str, Tuple[int, Any]] = {}
+
+
+def get_score_epoch(db=None) -> int:
+    db = db if db is not None else get_db()
+    row = db["_meta"].find_one({"_id": "score_epoch"}, {"value": 1})
+    return row["value"] if row else 0
+
+
+def _bump_score_epoch(db):
+    # Called after the write commits, never inside its transaction: a shared
+    # counter there would make every concurrent save conflict
+    db["_meta"].update_one({"_id": "score_epoch"}, {"$inc": {"value": 1}}, upsert=True)
+
+
+def cached_for_epoch(key: str, loader):
+    """Return loader()'s result, reused until the score epoch changes."""
+    epoch = get_score_epoch()
+    with _epoch_lock:
+        hit = _epoch_cache.get(key)
+        if hit and hit[0] == epoch:
+            return hit[1]
+    # Stored under the epoch read before loading, so a write racing the load
+    # only costs one extra rebuild on the next read
+    value = loader()
+    with _epoch_lock:
+        _epoch_cache[key] = (epoch, value)
+    return value
+
+
+# --- Leaderboard read model ---
+#
+# `leaderboard` holds one row per competitor (_id = competitor _id) with the
+# running total, count and average of its submissions' `avg`. Write paths compute
+# the score delta they cause and apply it here, so reads never join `submissions`.
+
+def _empty_leaderboard_row(competitor_oid: ObjectId, name: str, event_id: ObjectId) -> Dict[str, Any]:
+    return {
+        "_id": competitor_oid,
+        "event_id": event_id,
+        "name": name,
+        "total_score": 0,
+        "num_scores": 0,
+        "avg_score": 0,
+        "updated_at": datetime.utcnow(),
+    }
+
+
+def _add_score_delta(deltas: Dict[ObjectId, list], competitor_oid: ObjectId, old=None, new=None):
+    """Accumulate the (total, count) change of one score being replaced."""
+    delta = deltas.setdefault(competitor_oid, [0, 0])
+    if old is not None:
+        delta[0] -= old
+        delta[1] -= 1
+    if new is not None:
+        delta[0] += new
+        delta[1] += 1
+
+
+def _apply_leaderboard_deltas(db, deltas: Dict[ObjectId, list], session=None):
+    """Apply accumulated score deltas to the leaderboard in one bulk write."""
+    ops = []
+    now = datetime.utcnow()
+    for competitor_oid, (total_delta, count_delta) in deltas.items():
+        if not total_delta and not count_delta:
+            continue
+        # Pipeline update so total, count and average move together atomically
+        ops.append(
+            UpdateOne(
+                {"_id": competitor_oid},
+                [
+                    {
+                        "$set": {
+                            "total_score": {"$add": [{"$ifNull": ["$total_score", 0]}, total_delta]},
+                            "num_scores": {"$add": [{"$ifNull": ["$num_scores", 0]}, count_delta]},
+                            "updated_at": now,
+                        }
+                    },
+                    {"$set": _leaderboard_avg_fields()},
+                ],
+            )
+        )
+    if ops:
+        db.leaderboard.bulk_write(ops, ordered=False, session=session)
+
+
+def _leaderboard_avg_fields() -> Dict[str, Any]:
+    # Rounded so float drift from repeated deltas cannot split tied averages
+    has_scores = {"$gt": ["$num_scores", 0]}
+    return {
+        "total_score": {"$cond": [has_scores, "$total_score", 0]},
+        "avg_score": {
+            "$cond": [has_scores, {"$round": [{"$divide": ["$total_score", "$num_scores"]}, 6]}, 0]
+        },
+    }
+
+
+def _refresh_leaderboard_rows(db, event_id: ObjectId, competitor_oids: Iterable[ObjectId]):
+    """
+    Recompute some competitors' leaderboard rows from `submissions` on the server,
+    for writes that change many pairs at once. No submissions pass through the app.
+    """
+    competitor_oids = list(competitor_oids)
+    if not competitor_oids:
+        return
+    now = datetime.utcnow()
+    scoped = {"event_id": event_id, "competitor_id": {"$in": competitor_oids}}
+    db.submissions.aggregate(
+        [
+            {"$match": scoped},
+            {"$group": {"_id": "$competitor_id", "total_score": {"$sum": "$avg"}, "num_scores": {"$sum": 1}}},
+            {"$set": {**_leaderboard_avg_fields(), "updated_at": now}},
+            {"$merge": {"into": "leaderboard", "on": "_id", "whenMatched": "merge", "whenNotMatched": "discard"}},
+        ]
+    )
+    # Competitors left with no submissions formed no group above
+    scored = set(db.submissions.distinct("competitor_id", scoped))
+    emptied = [comp_oid for comp_oid in competitor_oids if comp_oid not in scored]
+    if emptied:
+        db.leaderboard.update_many(
+            {"_id": {"$in": emptied}},
+            {"$set": {"total_score": 0, "num_scores": 0, "avg_score": 0, "updated_at": now}},
+        )
+
+
+def rebuild_leaderboard(db=None):
+    """
+    Recompute the current event's leaderboard from scratch out of `competitors`
+    and `submissions`. Repair path only; normal writes keep it current incrementally.
+    """
+    if db is None:
+        db, event_id = get_db(), current_event_id()
+    else:
+        # Migrations pass their db; they work on pre-event data
+        event_id = _default_event_id(db)
+    totals = {
+        row["_id"]: row
+        for row in db.submissions.aggregate(
+            [
+                {"$match": {"event_id": event_id}},
+                {"$group": {"_id": "$competitor_id", "total_score": {"$sum": "$avg"}, "num_scores": {"$sum": 1}}},
+            ]
+        )
+    }
+    competitors = list(db.competitors.find({"event_id": event_id}, {"name": 1}))
+    now = datetime.utcnow()
+    ops = [DeleteMany({"event_id": event_id, "_id": {"$nin": [c["_id"] for c in competitors]}})]
+    for comp in competitors:
+        row = totals.get(comp["_id"], {"total_score": 0, "num_scores": 0})
+        num = row["num_scores"]
+        ops.append(
+            ReplaceOne(
+                {"_id": comp["_id"]},
+                {
+                    "event_id": event_id,
+                    "name": comp.get("name", ""),
+                    "total_score": row["total_score"] if num else 0,
+                    "num_scores": num,
+                    # Same rounding as _leaderboard_avg_fields
+                    "avg_score": round(row["total_score"] / num, 6) if num else 0,
+                    "updated_at": now,
+                },
+                upsert=True,
+            )
+        )
+    # One bulk write; other events' rows are untouched
+    _write_transaction(db, lambda session: db.leaderboard.bulk_write(ops, ordered=False, session=session))
+    _bump_score_epoch(db)
+
+
+def _pairs_filter(pairs, event_id: ObjectId) -> Dict[str, Any]:
+    return {"event_id": event_id, "$or": [{"judge_id": j, "competitor_id": c} for j, c in pairs]}
+
+
+def _score_snapshot(
+    db, pairs: Iterable[Tuple[ObjectId, ObjectId]], event_id: ObjectId, session=None
+) -> Dict[Tuple[ObjectId, ObjectId], float]:
+    """Current averages for the given (judge_id, competitor_id) pairs of one event."""
+    pairs = list(pairs)
+    if not pairs:
+        return {}
+    query = _pairs_filter(pairs, event_id)
+    return {
+        (row["judge_id"], row["competitor_id"]): row["avg"]
+        for row in db.submissions.find(query, {"judge_id": 1, "competitor_id": 1, "avg": 1}, session=session)
+    }
+
+
+# --- Settings cache ---
+#
+# Background colour, banner and intro message are read on nearly every rerun
+# but change rarely. They are cached per process and invalidated through a
+# generation counter in `_meta` that every setter bumps, so all app replicas
+# notice a change within SETTINGS_CHECK_INTERVAL seconds.
+
+SETTINGS_CHECK_INTERVAL = 2.0
+
+_settings_lock = threading.Lock()
+_settings_cache: Dict[str, Any] = {"generation": None, "checked_at": 0.0, "values": {}}
+
+
+def _read_settings_generation(db) -> int:
+    row = db["_meta"].find_one({"_id": "settings_generation"}, {"value": 1})
+    return row["value"] if row else 0
+
+
+def _bump_settings_generation(db):
+    row = db["_meta"].find_one_and_update(
+        {"_id": "settings_generation"},
+        {"$inc": {"value": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    with _settings_lock:
+        _settings_cache["generation"] = row["value"]
+        _settings_cache["checked_at"] = time.monotonic()
+        _settings_cache["values"] = {}
+
+
+def _refresh_settings_generation(db):
+    # Caller holds _settings_lock
+    now = time.monotonic()
+    if now - _settings_cache["checked_at"] >= SETTINGS_CHECK_INTERVAL:
+        generation = _read_settings_generation(db)
+        if generation != _settings_cache["generation"]:
+            _settings_cache["generation"] = generation
+            _settings_cache["values"] = {}
+        _settings_cache["checked_at"] = now
+
+
+def get_settings_generation() -> int:
+    """Current settings generation; lets pages memoize chrome built from settings."""
+    db = get_db()
+    with _settings_lock:
+        _refresh_settings_generation(db)
+        return _settings_cache["generation"]
+
+
+def _cached_setting(key: str, loader):
+    db = get_db()
+    key = f"{current_event_id()}:{key}"
+    with _settings_lock:
+        _refresh_settings_generation(db)
+        values = _settings_cache["values"]
+        if key in values:
+            return values[key]
+    value = loader(db)
+    with _settings_lock:
+        # Drop the value if the cache was invalidated while loading
+        if _settings_cache["values"] is values:
+            values[key] = value
+    return value
+
+
 # --- Assets / customization helpers ---
+BANNER_VARIANT_WIDTHS = (640, 1280, 1920)
+BANNER_DISPLAY_WIDTH = 1280
+
+
 def save_banner_image(file_bytes: bytes, filename: str, content_type: str):
-    """Save or replace the banner image in the `assets` collection."""
+    """
+    Save or replace the banner image in the `assets` collection, together with
+    its content hash and resized WebP variants stored as `banner_variant` docs.
+    """
     db = get_db()
+    digest = hashlib.sha256(file_bytes).hexdigest()
+    variants = _render_banner_variants(file_bytes)
+    # Re-uploading the same image replaces its variants rather than duplicating them
+    db.assets.delete_many(_scoped({"key": "banner_variant", "hash": digest}))
+    if variants:
+        db.assets.insert_many(_banner_variant_docs(digest, variants, event_id=current_event_id()))
     doc = {
         "key": "banner",
         "filename": filename,
         "content_type": content_type,
         "data": Binary(file_bytes),
+        "hash": digest,
+        "variant_widths": [width for width, _ in variants],
         "updated_at": datetime.utcnow(),
     }
-    db.assets.update_one({"key": "banner"}, {"$set": doc}, upsert=True)
+    db.assets.update_one(_scoped({"key": "banner"}), {"$set": doc}, upsert=True)
+    # Old variants go only after the banner points at the new hash
+    db.assets.delete_many(_scoped({"key": "banner_variant", "hash": {"$ne": digest}}))
+    _bump_settings_generation(db)
+
+
+def _banner_variant_docs(digest: str, variants, **fields):
+    return [
+        {
+            **fields,
+            "key": "banner_variant",
+            "hash": digest,
+            "width": width,
+            "content_type": "image/webp",
+            "data": Binary(data),
+        }
+        for width, data in variants
+    ]
+
+
+def _render_banner_variants(file_bytes: bytes):
+    """Return [(width, webp_bytes)] for each variant width, or [] if the image can't be decoded."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return []
+    variants = []
+    try:
+        with Image.open(io.BytesIO(file_bytes)) as img:
+            img.load()
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA")
+            for width in BANNER_VARIANT_WIDTHS:
+                width = min(width, img.width)
+                height = max(1, round(img.height * width / img.width))
+                resized = img if width == img.width else img.resize((width, height), Image.LANCZOS)
+                out = io.BytesIO()
+                resized.save(out, format="WEBP", quality=80, method=4)
+                variants.append((width, out.getvalue()))
+                if width == img.width:
+                    # No point upscaling past the original
+                    break
+    except Exception:
+        return []
+    return variants
 
 
 def get_banner_image():
     """Return banner image as dict or None: {filename, content_type, data(bytes)}"""
-    db = get_db()
-    row = db.assets.find_one({"key": "banner"})
+    banner = _cached_setting("banner", _load_banner_image)
+    return dict(banner) if banner else None
+
+
+def _load_banner_image(db):
+    row = db.assets.find_one(_scoped({"key": "banner"}))
     if not row:
         return None
     return {
@@ -321,10 +1592,39 @@ def get_banner_image():
     }
 
 
+def get_banner_for_display(max_width: int = BANNER_DISPLAY_WIDTH) -> Optional[bytes]:
+    """
+    Return image bytes for showing the banner: the smallest variant at least
+    `max_width` wide (or the largest available). Variants are fetched once per
+    content hash; falls back to the original for banners saved without variants.
+    """
+    meta = _cached_setting("banner_meta", _load_banner_meta)
+    if not meta:
+        return None
+    widths = sorted(meta.get("variant_widths") or [])
+    if not meta.get("hash") or not widths:
+        banner = get_banner_image()
+        return banner["data"] if banner else None
+    width = next((w for w in widths if w >= max_width), widths[-1])
+    return _get_banner_variant(str(current_event_id()), meta["hash"], width)
+
+
+def _load_banner_meta(db):
+    return db.assets.find_one(_scoped({"key": "banner"}), {"_id": 0, "hash": 1, "variant_widths": 1})
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _get_banner_variant(event_id: str, digest: str, width: int) -> Optional[bytes]:
+    # Keyed by content hash, so an unchanged banner is never refetched
+    row = get_db().assets.find_one({"event_id": _oid(event_id), "key": "banner_variant", "hash": digest, "width": width})
+    return bytes(row["data"]) if row else None
+
+
 def delete_banner_image():
-    """Remove the banner image document from the assets collection."""
+    """Remove the banner image and its variants from the assets collection."""
     db = get_db()
-    db.assets.delete_many({"key": "banner"})
+    db.assets.delete_many(_scoped({"key": {"$in": ["banner", "banner_variant"]}}))
+    _bump_settings_generation(db)
 
 def set_background_color(color_hex: str):
     """Persist a background color setting (hex string)."""
@@ -334,12 +1634,15 @@ def set_background_color(color_hex: str):
         "color": color_hex,
         "updated_at": datetime.utcnow(),
     }
-    db.assets.update_one({"key": "background_color"}, {"$set": doc}, upsert=True)
+    db.assets.update_one(_scoped({"key": "background_color"}), {"$set": doc}, upsert=True)
+    _bump_settings_generation(db)
 
 def get_background_color() -> Optional[str]:
     """Return stored background color hex string or None."""
-    db = get_db()
-    row = db.assets.find_one({"key": "background_color"})
+    return _cached_setting("background_color", _load_background_color)
+
+def _load_background_color(db) -> Optional[str]:
+    row = db.assets.find_one(_scoped({"key": "background_color"}))
     if not row:
         return None
     return row.get("color")
@@ -347,7 +1650,8 @@ def get_background_color() -> Optional[str]:
 def clear_background_color():
     """Remove background color setting."""
     db = get_db()
-    db.assets.delete_many({"key": "background_color"})
+    db.assets.delete_many(_scoped({"key": "background_color"}))
+    _bump_settings_generation(db)
 
 def set_intro_message(text: str):
     """Persist intro message shown to judges on the scoring page."""
@@ -357,55 +1661,39 @@ def set_intro_message(text: str):
         "text": text,
         "updated_at": datetime.utcnow(),
     }
-    db.assets.update_one({"key": "intro_message"}, {"$set": doc}, upsert=True)
+    db.assets.update_one(_scoped({"key": "intro_message"}), {"$set": doc}, upsert=True)
+    _bump_settings_generation(db)
 
 def get_intro_message() -> Optional[str]:
-    db = get_db()
-    row = db.assets.find_one({"key": "intro_message"})
+    return _cached_setting("intro_message", _load_intro_message)
+
+def _load_intro_message(db) -> Optional[str]:
+    row = db.assets.find_one(_scoped({"key": "intro_message"}))
     if not row:
         return None
     return row.get("text")
 
 def clear_intro_message():
     db = get_db()
-    db.assets.delete_many({"key": "intro_message"})
+    db.assets.delete_many(_scoped({"key": "intro_message"}))
+    _bump_settings_generation(db)
 
 
 # --- Questions/answers ---
 
-def _recompute_scores_from_answers(db):
-    """
-    Rebuild scores collection by averaging existing answers per judge+competitor.
-    """
-    db.scores.delete_many({})
-    pipeline = [
-        {
-            "$group": {
-                "_id": {"judge_id": "$judge_id", "competitor_id": "$competitor_id"},
-                "avg_value": {"$avg": "$value"},
-            }
-        }
-    ]
-    docs = []
-    for row in db.answers.aggregate(pipeline):
-        docs.append(
-            {
-                "judge_id": row["_id"]["judge_id"],
-                "competitor_id": row["_id"]["competitor_id"],
-                "value": row["avg_value"],
-            }
-        )
-    if docs:
-        db.scores.insert_many(docs)
-
 def get_questions():
+    db, session = _reads()
+    rows = db.questions.find(_scoped(), Question.projection(), session=session).sort("_id", ASCENDING)
+    return _records(Question, rows)
+
+def get_questions_page(page: int = 0, page_size: int = ADMIN_PAGE_SIZE):
+    """One page of questions in creation order; returns (rows, total)."""
     db = get_db()
-    rows = db.questions.find().sort("_id", ASCENDING)
-    return [_doc_with_id(r) for r in rows]
+    return _paged(db.questions, _scoped(), page, page_size, Question)
 
 def insert_question(prompt):
     db = get_db()
-    db.questions.insert_one({"prompt": prompt})
+    db.questions.insert_one({"event_id": current_event_id(), "prompt": prompt})
 
 def update_question(question_id, prompt):
     db = get_db()
@@ -414,16 +1702,260 @@ def update_question(question_id, prompt):
 def delete_question(question_id):
     db = get_db()
     question_oid = _oid(question_id)
-    db.answers.delete_many({"question_id": question_oid})
+    event_id = current_event_id()
+    answered = {"event_id": event_id, "question_ids": question_oid}
+    competitor_oids = db.submissions.distinct("competitor_id", answered)
+    judge_oids = db.submissions.distinct("judge_id", answered)
+    if competitor_oids:
+        # Drop the answer and re-average the rest server-side, in one update
+        db.submissions.update_many(
+            answered,
+            [
+                {"$unset": f"answers.{question_oid}"},
+                {
+                    "$set": {
+                        "question_ids": {
+                            "$filter": {"input": "$question_ids", "as": "q", "cond": {"$ne": ["$$q", question_oid]}}
+                        },
+                        "avg": {"$avg": {"$map": {"input": {"$objectToArray": "$answers"}, "as": "a", "in": "$$a.v"}}},
+                        "version": {"$add": ["$version", 1]},
+                        "updated_at": "$$NOW",
+                    }
+                },
+            ],
+        )
+        # Pairs that only answered this question have nothing left to average
+        db.submissions.delete_many({"event_id": event_id, "competitor_id": {"$in": competitor_oids}, "avg": None})
     db.questions.delete_one({"_id": question_oid})
-    _recompute_scores_from_answers(db)
+    _bump_answers_version(db, judge_oids)
+    _refresh_leaderboard_rows(db, event_id, competitor_oids)
+    _bump_score_epoch(db)
 
-def get_answers_for_judge_competitor(judge_id, competitor_id):
+def get_answers_for_judge_competitor(judge_id, competitor_id) -> Dict[str, float]:
+    """One pair's answers, {question id: value}, in a single point read."""
     db = get_db()
-    rows = db.answers.find(
-        {"judge_id": _oid(judge_id), "competitor_id": _oid(competitor_id)}
+    row = db.submissions.find_one(
+        _scoped({"judge_id": _oid(judge_id), "competitor_id": _oid(competitor_id)}), {"answers": 1, "_id": 0}
     )
-    return {str(row["question_id"]): row["value"] for row in rows}
+    return dict(row["answers"]) if row else {}
+
+
+def get_answers_for_judge(judge_id) -> Dict[str, Dict[str, float]]:
+    """All of a judge's answers in the current event in one query: {competitor id: {question id: value}}."""
+    db = get_db()
+    rows = db.submissions.find(_scoped({"judge_id": _oid(judge_id)}), {"competitor_id": 1, "answers": 1, "_id": 0})
+    return {str(row["competitor_id"]): row["answers"] for row in rows if row["answers"]}
+
+
+def get_judge_answers(judge: ReadModel, cache: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """
+    Serve a judge's answers from a per-session `cache` dict, reloading only when
+    the judge document's answers_version no longer matches the cached copy.
+    """
+    version = judge.get("answers_version", 0)
+    event_id = str(current_event_id())
+    if cache.get("judge_id") != judge["id"] or cache.get("event_id") != event_id or cache.get("version") != version:
+        cache.clear()
+        cache.update(
+            judge_id=judge["id"], event_id=event_id, version=version, answers=get_answers_for_judge(judge["id"])
+        )
+    return cache["answers"]
+
+
+def _bump_answers_version(db, judge_oids, session=None):
+    # Invalidates session answer caches for judges whose answers changed outside their own saves
+    judge_oids = list(judge_oids)
+    if judge_oids:
+        db.judges.update_many({"_id": {"$in": judge_oids}}, {"$inc": {"answers_version": 1}}, session=session)
+
+
+# --- Bulk import ---
+
+IMPORT_BATCH_SIZE = 500
+
+# Columns per import kind: (required, optional)
+IMPORT_COLUMNS = {
+    "competitors": (("name",), ("notes",)),
+    "judges": (("name", "email", "username", "password"), ()),
+    "questions": (("prompt",), ()),
+}
+
+
+def iter_csv_rows(stream, required: Iterable[str], optional: Iterable[str] = ()):
+    """
+    Stream an uploaded CSV (binary file object) and yield (line_no, values, error)
+    per data row. Headers are matched case-insensitively; ValueError if a required
+    column is missing.
+    """
+    required, optional = tuple(required), tuple(optional)
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    headers = {(h or "").strip().lower(): h for h in reader.fieldnames or []}
+    missing = [field for field in required if field not in headers]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+    for row in reader:
+        values = {f: (row.get(headers[f]) or "").strip() for f in required + optional if f in headers}
+        blank = [field for field in required if not values.get(field)]
+        yield reader.line_num, values, (f"Missing {', '.join(blank)}" if blank else None)
+
+
+def import_csv(kind: str, stream) -> Dict[str, Any]:
+    """
+    Bulk import competitors, judges or questions from a CSV upload.
+    Returns {"inserted": n, "errors": [(line_no, message), ...]}.
+    """
+    required, optional = IMPORT_COLUMNS[kind]
+    writer = {"competitors": _import_competitors, "judges": _import_judges, "questions": _import_questions}[kind]
+    db = get_db()
+    report: Dict[str, Any] = {"inserted": 0, "errors": []}
+    batch = []
+    for line_no, values, error in iter_csv_rows(stream, required, optional):
+        if error:
+            report["errors"].append((line_no, error))
+            continue
+        batch.append((line_no, values))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            writer(db, batch, report)
+            batch = []
+    if batch:
+        writer(db, batch, report)
+    report["errors"].sort()
+    return report
+
+
+def _insert_unordered(collection, docs) -> Dict[int, str]:
+    """insert_many(ordered=False); returns {position in docs: message} for rejected documents."""
+    if not docs:
+        return {}
+    try:
+        collection.insert_many(docs, ordered=False)
+    except BulkWriteError as exc:
+        return {err["index"]: _write_error_message(err) for err in exc.details.get("writeErrors", [])}
+    return {}
+
+
+def _write_error_message(err: Dict[str, Any]) -> str:
+    if err.get("code") == 11000:
+        fields = ", ".join(f"{key} '{value}'" for key, value in (err.get("keyValue") or {}).items())
+        return f"Duplicate {fields}" if fields else "Duplicate value"
+    return err.get("errmsg", "Write failed")
+
+
+def _import_competitors(db, batch, report):
+    event_id = current_event_id()
+    docs = [
+        {"_id": ObjectId(), "event_id": event_id, "name": v["name"], "name_lc": v["name"].lower(), "notes": v.get("notes", "")}
+        for _, v in batch
+    ]
+    failed = _insert_unordered(db.competitors, docs)
+    inserted = [doc for i, doc in enumerate(docs) if i not in failed]
+    _insert_unordered(db.leaderboard, [_empty_leaderboard_row(doc["_id"], doc["name"], event_id) for doc in inserted])
+    if inserted:
+        _bump_score_epoch(db)
+    report["inserted"] += len(inserted)
+    report["errors"].extend((batch[i][0], message) for i, message in failed.items())
+
+
+def _import_judges(db, batch, report):
+    # Judges first (unique email), then logins for the judges that made it
+    # in (unique username); judges whose login is rejected are removed again.
+    event_ids = [current_event_id()]
+    judges = [{"_id": ObjectId(), **_judge_fields(v["name"], v["email"]), "event_ids": event_ids} for _, v in batch]
+    failed = _insert_unordered(db.judges, judges)
+    kept = [i for i in range(len(batch)) if i not in failed]
+    hashes = [hash_password(batch[i][1]["password"]) for i in kept]
+    users = [
+        {"username": batch[i][1]["username"], "password_hash": digest, "role": "judge", "judge_id": judges[i]["_id"]}
+        for i, digest in zip(kept, hashes)
+    ]
+    user_failed = _insert_unordered(db.users, users)
+    if user_failed:
+        db.judges.delete_many({"_id": {"$in": [users[j]["judge_id"] for j in user_failed]}})
+        failed.update({kept[j]: message for j, message in user_failed.items()})
+    report["inserted"] += len(batch) - len(failed)
+    report["errors"].extend((batch[i][0], failed[i]) for i in sorted(failed))
+
+
+def _import_questions(db, batch, report):
+    event_id = current_event_id()
+    failed = _insert_unordered(db.questions, [{"event_id": event_id, "prompt": v["prompt"]} for _, v in batch])
+    report["inserted"] += len(batch) - len(failed)
+    report["errors"].extend((batch[i][0], message) for i, message in failed.items())
+
+
+# --- Exports ---
+
+DETAILED_EXPORT_BASE_FIELDS = [
+    "Judge ID",
+    "Judge Name",
+    "Username",
+    "Judge Email",
+    "Competitor ID",
+    "Competitor",
+    "Competitor Notes",
+]
+
+
+@workload(ANALYTICS)
+def count_detailed_submissions() -> int:
+    """Rows iter_detailed_submissions() yields after its header: one per judge x competitor."""
+    db, session = _reads()
+    judges = db.judges.count_documents(_judges_query(), session=session)
+    return judges * db.competitors.count_documents(_scoped(), session=session)
+
+
+@workload(ANALYTICS)
+def iter_detailed_submissions():
+    """
+    Stream the detailed submissions export as lists: a header row first, then
+    one row per judge x competitor with a column per question.
+
+    Judges, competitors and questions are loaded once; submissions come from a
+    single cursor sorted by (judge_id, competitor_id), which is merge-joined
+    against the judge x competitor grid as rows stream.
+    """
+    db, session = _reads()
+    judges = get_judges_with_user()
+    competitors = get_competitors(Competitor)
+    questions = get_questions()
+    question_ids = [q["id"] for q in questions]
+
+    yield DETAILED_EXPORT_BASE_FIELDS + [f"Q: {q['prompt']}" for q in questions] + ["Average Score"]
+
+    cursor = db.submissions.find(
+        _scoped(), {"_id": 0, "judge_id": 1, "competitor_id": 1, "answers": 1}, session=session
+    ).sort([("judge_id", ASCENDING), ("competitor_id", ASCENDING)])
+    pending = next(cursor, None)
+
+    for j in judges:
+        j_oid = j._oid
+        for c in competitors:
+            key = (j_oid, c._oid)
+            answers = {}
+            # Skip submissions of pairs that sort before this one (orphans), take this pair's
+            while pending is not None and (pending["judge_id"], pending["competitor_id"]) <= key:
+                if (pending["judge_id"], pending["competitor_id"]) == key:
+                    answers = pending["answers"]
+                pending = next(cursor, None)
+
+            row = [j["id"], j.get("name"), j.get("username"), j.get("email"), c["id"], c.get("name"), c.get("notes", "")]
+            vals = []
+            for qid in question_ids:
+                raw = answers.get(qid)
+                if raw is None:
+                    row.append("")
+                    continue
+                try:
+                    # stored as multiples of 10 — convert back to 0-10 scale
+                    cell = float(raw) / 10.0
+                    vals.append(cell)
+                except Exception:
+                    cell = raw
+                row.append(cell)
+            # avg of question values (0-10), empty if no vals
+            row.append(round(sum(vals) / len(vals), 2) if vals else "")
+            yield row
+    cursor.close()
 
 
 # --- Auth helpers ---
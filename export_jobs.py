@@ -0,0 +1,224 @@
+"""
+Background exports of the leaderboard and detailed submissions.
+
+An export runs on its own worker thread: rows stream from the database in
+chunks of EXPORT_CHUNK_SIZE straight into a temp file as CSV, XLSX or
+Parquet, so memory stays flat however large the event is. Jobs report
+progress as they go and keep their file for EXPORT_TTL seconds after they
+finish; the page offers the download once a job is done.
+
+Jobs live in this process only, like the write-behind queue.
+"""
+import csv
+import os
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional
+
+import streamlit as st
+
+import db
+
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_TTL = 3600
+
+FORMATS = {
+    "csv": ("CSV", "text/csv"),
+    "xlsx": ("Excel", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet"),
+}
+
+LEADERBOARD_FIELDS = [
+    "Rank",
+    "Competitor",
+    "Number of Judges that entered scores",
+    "Total Score",
+    "Average Score",
+]
+
+
+def _leaderboard_source():
+    rows = db.get_ranked_leaderboard()
+
+    def iter_rows():
+        yield LEADERBOARD_FIELDS
+        for row in rows:
+            yield [
+                row["rank"],
+                row["competitor_name"],
+                row["num_scores"],
+                round(row["total_score"], 2),
+                round(row.get("avg_score", 0), 2),
+            ]
+
+    return iter_rows(), len(rows), ["int", "str", "int", "float", "float"]
+
+
+def _detailed_source():
+    rows = db.iter_detailed_submissions()
+    header = next(rows)
+    base = len(db.DETAILED_EXPORT_BASE_FIELDS)
+    types = ["str"] * base + ["float"] * (len(header) - base)
+    return _prepend(header, rows), db.count_detailed_submissions(), types
+
+
+EXPORTS = {
+    "leaderboard": ("Leaderboard", _leaderboard_source),
+    "detailed": ("Detailed submissions", _detailed_source),
+}
+
+
+def _prepend(first, rows: Iterator[list]) -> Iterator[list]:
+    yield first
+    yield from rows
+
+
+@st.cache_resource
+def get_export_manager() -> "ExportManager":
+    return ExportManager(os.path.join(tempfile.gettempdir(), "judging_exports"))
+
+
+class ExportJob:
+    def __init__(self, kind: str, fmt: str, event_id, causal_token: Dict[str, Any], path: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.fmt = fmt
+        self.event_id = event_id
+        self.causal_token = causal_token
+        self.path = path
+        self.filename = f"{kind}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+        self.status = "running"
+        self.rows_written = 0
+        self.total: Optional[int] = None
+        self.error: Optional[str] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def progress(self) -> float:
+        if self.status == "done":
+            return 1.0
+        return min(self.rows_written / self.total, 1.0) if self.total else 0.0
+
+
+class ExportManager:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, ExportJob] = {}
+
+    def start(self, kind: str, fmt: str) -> ExportJob:
+        """Start exporting `kind` (a key of EXPORTS) for the current event as `fmt`."""
+        self.purge_expired()
+        os.makedirs(self.directory, exist_ok=True)
+        fd, path = tempfile.mkstemp(suffix=f".{fmt}", dir=self.directory)
+        os.close(fd)
+        # The worker has no script run of its own, so it gets the event and the
+        # admin's causal token (to read their own writes) explicitly
+        job = ExportJob(kind, fmt, db.current_event_id(), dict(db.causal_token()), path)
+        with self._lock:
+            self._jobs[job.id] = job
+        threading.Thread(target=self._run, args=(job,), name=f"export-{job.id[:8]}", daemon=True).start()
+        return job
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            expired = [j for j in self._jobs.values() if j.finished_at and now - j.finished_at > EXPORT_TTL]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            _remove(job.path)
+
+    def _run(self, job: ExportJob):
+        db.set_current_event(job.event_id)
+        db.bind_causal_token(job.causal_token)
+        try:
+            rows, job.total, types = EXPORTS[job.kind][1]()
+            WRITERS[job.fmt](job, rows, types)
+            job.status = "done"
+        except Exception as exc:
+            job.status, job.error = "failed", str(exc)
+            _remove(job.path)
+        finally:
+            job.finished_at = time.time()
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _chunks(rows: Iterator[list]) -> Iterator[List[list]]:
+    while True:
+        chunk = list(islice(rows, EXPORT_CHUNK_SIZE))
+        if not chunk:
+            return
+        yield chunk
+
+
+# Each writer gets the header as the first row and counts data rows into job.rows_written
+
+def _write_csv(job: ExportJob, rows: Iterator[list], types: List[str]):
+    with open(job.path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(next(rows))
+        for chunk in _chunks(rows):
+            writer.writerows(chunk)
+            job.rows_written += len(chunk)
+
+
+def _write_xlsx(job: ExportJob, rows: Iterator[list], types: List[str]):
+    from openpyxl import Workbook
+
+    # Write-only workbooks stream rows to disk instead of keeping cells in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(EXPORTS[job.kind][0][:31])
+    sheet.append(next(rows))
+    for chunk in _chunks(rows):
+        for row in chunk:
+            sheet.append([None if cell == "" else cell for cell in row])
+        job.rows_written += len(chunk)
+    workbook.save(job.path)
+
+
+def _write_parquet(job: ExportJob, rows: Iterator[list], types: List[str]):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    header = next(rows)
+    arrow_types = {"str": pa.string(), "int": pa.int64(), "float": pa.float64()}
+    # Column names must be unique in Parquet; question prompts may repeat
+    names = [name if header.index(name) == i else f"{name} ({i})" for i, name in enumerate(header)]
+    schema = pa.schema([(name, arrow_types[t]) for name, t in zip(names, types)])
+    with pq.ParquetWriter(job.path, schema) as writer:
+        for chunk in _chunks(rows):
+            columns = [
+                pa.array([_parquet_cell(row[i], t) for row in chunk], type=arrow_types[t])
+                for i, t in enumerate(types)
+            ]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            job.rows_written += len(chunk)
+
+
+def _parquet_cell(value: Any, column_type: str):
+    if value == "" or value is None:
+        return None
+    if column_type == "str":
+        return str(value)
+    try:
+        return int(value) if column_type == "int" else float(value)
+    except (TypeError, ValueError):
+        return None  # a malformed stored answer; CSV and XLSX keep it as-is
+
+
+WRITERS = {"csv": _write_csv, "xlsx": _write_xlsx, "parquet": _write_parquet}
@@ -0,0 +1,1408 @@
+"""
+In-memory storage engine for db.py.
+
+Implements the subset of the pymongo Database / Collection API that db.py
+uses (CRUD, find_one_and_*, bulk_write, a practical set of aggregation
+stages and expressions, unique/sparse indexes) on plain Python dicts, so
+the app, demos and benchmarks can run without a MongoDB server.
+
+Select it in .streamlit/secrets.toml:
+
+    [database]
+    backend = "memory"
+
+Data lives for the lifetime of the process; nothing is persisted. Clients
+accept pymongo CommandListeners via `event_listeners` and report each
+collection call to them as one command.
+"""
+import functools
+import itertools
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+
+_MISSING = object()
+
+
+# --- Document helpers ---
+
+def _copy(value):
+    # Dicts and lists are copied; leaves (ObjectId, datetime, bytes...) are immutable
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+def _get_path(doc, path: str):
+    current = doc
+    parts = path.split(".")
+    for i, part in enumerate(parts):
+        if isinstance(current, dict) and part in current:
+            current = current[part]
+        elif isinstance(current, list) and part.isdigit() and int(part) < len(current):
+            current = current[int(part)]
+        elif isinstance(current, list):
+            # "items.value" over an array of documents yields the array of values
+            rest = ".".join(parts[i:])
+            values = [_get_path(item, rest) for item in current if isinstance(item, dict)]
+            return [v for v in values if v is not _MISSING]
+        else:
+            return _MISSING
+    return current
+
+
+def _set_path(doc, path: str, value):
+    parts = path.split(".")
+    current = doc
+    for part in parts[:-1]:
+        current = current.setdefault(part, {})
+    current[parts[-1]] = value
+
+
+def _unset_path(doc, path: str):
+    parts = path.split(".")
+    current = doc
+    for part in parts[:-1]:
+        current = current.get(part)
+        if not isinstance(current, dict):
+            return
+    current.pop(parts[-1], None)
+
+
+def _hashable(value):
+    if isinstance(value, dict):
+        return ("__doc__", tuple((k, _hashable(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return ("__list__", tuple(_hashable(v) for v in value))
+    return value
+
+
+# Rough BSON comparison order so mixed-type sorts behave like MongoDB
+_TYPE_RANK = [
+    (type(None), 1),
+    (bool, 8),
+    (int, 2),
+    (float, 2),
+    (str, 3),
+    (dict, 4),
+    (list, 5),
+    (bytes, 6),
+    (ObjectId, 7),
+    (datetime, 9),
+]
+
+
+def _sort_key(value):
+    if value is _MISSING or value is None:
+        return (1, 0)
+    for kind, rank in _TYPE_RANK:
+        if isinstance(value, kind):
+            if kind is dict:
+                return (rank, tuple((k, _sort_key(v)) for k, v in value.items()))
+            if kind is list:
+                return (rank, tuple(_sort_key(v) for v in value))
+            return (rank, value)
+    return (10, str(value))
+
+
+def _compare(a, b) -> int:
+    ka, kb = _sort_key(a), _sort_key(b)
+    return (ka > kb) - (ka < kb)
+
+
+def _normalize_sort(key_or_list, direction=None) -> List[Tuple[str, int]]:
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction if direction is not None else 1)]
+    if isinstance(key_or_list, dict):
+        return list(key_or_list.items())
+    return [(k, d) for k, d in key_or_list]
+
+
+def _sort_docs(docs: List[dict], spec: List[Tuple[str, int]]) -> List[dict]:
+    # Stable multi-key sort: apply keys from last to first
+    for field, direction in reversed(spec):
+        docs.sort(key=lambda d: _sort_key(_get_path(d, field)), reverse=direction < 0)
+    return docs
+
+
+# --- Query matching ---
+
+def _values_for_match(value):
+    # A query on an array field matches if any element matches
+    if isinstance(value, list):
+        return [value] + value
+    return [value]
+
+
+def _match_operator(value, op: str, arg, doc) -> bool:
+    if op == "$eq":
+        return any(v is not _MISSING and _compare(v, arg) == 0 for v in _values_for_match(value)) or (
+            arg is None and value is _MISSING
+        )
+    if op == "$ne":
+        return not _match_operator(value, "$eq", arg, doc)
+    if op == "$in":
+        return any(_match_operator(value, "$eq", a, doc) for a in arg)
+    if op == "$nin":
+        return not _match_operator(value, "$in", arg, doc)
+    if op in ("$gt", "$gte", "$lt", "$lte"):
+        if value is _MISSING:
+            return False
+        for v in _values_for_match(value):
+            if v is None and arg is not None:
+                continue
+            c = _compare(v, arg)
+            if (op == "$gt" and c > 0) or (op == "$gte" and c >= 0) or (op == "$lt" and c < 0) or (
+                op == "$lte" and c <= 0
+            ):
+                return True
+        return False
+    if op == "$exists":
+        return (value is not _MISSING) == bool(arg)
+    if op == "$regex":
+        return False  # handled with $options in _match_field
+    if op == "$not":
+        return not _match_field(value, arg, doc)
+    if op == "$size":
+        return isinstance(value, list) and len(value) == arg
+    raise OperationFailure(f"memory backend: unsupported query operator {op}")
+
+
+def _match_field(value, condition, doc) -> bool:
+    if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+        for op, arg in condition.items():
+            if op == "$options":
+                continue
+            if op == "$regex":
+                flags = re.IGNORECASE if "i" in condition.get("$options", "") else 0
+                pattern = arg if hasattr(arg, "search") else re.compile(arg, flags)
+                if not any(isinstance(v, str) and pattern.search(v) for v in _values_for_match(value)):
+                    return False
+            elif not _match_operator(value, op, arg, doc):
+                return False
+        return True
+    if hasattr(condition, "search") and hasattr(condition, "pattern"):
+        return any(isinstance(v, str) and condition.search(v) for v in _values_for_match(value))
+    return _match_operator(value, "$eq", condition, doc)
+
+
+def match(doc: dict, query: Optional[dict], variables: Optional[dict] = None) -> bool:
+    if not query:
+        return True
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(match(doc, q, variables) for q in condition):
+                return False
+        elif key == "$or":
+            if not any(match(doc, q, variables) for q in condition):
+                return False
+        elif key == "$nor":
+            if any(match(doc, q, variables) for q in condition):
+                return False
+        elif key == "$expr":
+            if not _truthy(evaluate(condition, doc, variables)):
+                return False
+        elif not _match_field(_get_path(doc, key), condition, doc):
+            return False
+    return True
+
+
+# --- Aggregation expressions ---
+
+def _numbers(values):
+    return [v for v in values if isinstance(v, (int, float)) and not isinstance(v, bool)]
+
+
+def _array_or_args(args, doc, variables):
+    # $sum/$avg/$min/$max take either a single array expression or a list of expressions
+    if isinstance(args, list):
+        values = [evaluate(a, doc, variables) for a in args]
+        if len(values) == 1 and isinstance(values[0], list):
+            return values[0]
+        return values
+    value = evaluate(args, doc, variables)
+    return value if isinstance(value, list) else [value]
+
+
+def _operator(op: str, args, doc, variables):
+    def ev(expr):
+        return evaluate(expr, doc, variables)
+
+    def evl():
+        return [ev(a) for a in (args if isinstance(args, list) else [args])]
+
+    if op == "$literal":
+        return args
+    if op == "$add":
+        values = evl()
+        if any(v is None for v in values):
+            return None
+        return sum(values)
+    if op == "$subtract":
+        a, b = evl()
+        return None if a is None or b is None else a - b
+    if op == "$multiply":
+        result = 1
+        for v in evl():
+            if v is None:
+                return None
+            result *= v
+        return result
+    if op == "$divide":
+        a, b = evl()
+        return None if a is None or b is None else a / b
+    if op == "$mod":
+        a, b = evl()
+        return None if a is None or b is None else a % b
+    if op == "$round":
+        values = evl()
+        number, places = values[0], (values[1] if len(values) > 1 else 0)
+        if number is None:
+            return None
+        # Python's round() is half-to-even, like MongoDB's $round
+        return round(number, places)
+    if op == "$size":
+        value = ev(args[0] if isinstance(args, list) else args)
+        if not isinstance(value, list):
+            raise OperationFailure("memory backend: $size requires an array")
+        return len(value)
+    if op == "$sum":
+        return sum(_numbers(_array_or_args(args, doc, variables)))
+    if op == "$avg":
+        nums = _numbers(_array_or_args(args, doc, variables))
+        return sum(nums) / len(nums) if nums else None
+    if op in ("$min", "$max"):
+        values = [v for v in _array_or_args(args, doc, variables) if v is not None and v is not _MISSING]
+        if not values:
+            return None
+        picker = min if op == "$min" else max
+        return picker(values, key=_sort_key)
+    if op == "$cond":
+        if isinstance(args, dict):
+            cond, then, other = args["if"], args["then"], args["else"]
+        else:
+            cond, then, other = args
+        return ev(then) if _truthy(ev(cond)) else ev(other)
+    if op == "$ifNull":
+        values = args if isinstance(args, list) else [args]
+        for expr in values[:-1]:
+            value = ev(expr)
+            if value is not None and value is not _MISSING:
+                return value
+        return ev(values[-1])
+    if op in ("$eq", "$ne", "$gt", "$gte", "$lt", "$lte"):
+        a, b = evl()
+        c = _compare(None if a is _MISSING else a, None if b is _MISSING else b)
+        return {
+            "$eq": c == 0,
+            "$ne": c != 0,
+            "$gt": c > 0,
+            "$gte": c >= 0,
+            "$lt": c < 0,
+            "$lte": c <= 0,
+        }[op]
+    if op == "$and":
+        return all(_truthy(v) for v in evl())
+    if op == "$or":
+        return any(_truthy(v) for v in evl())
+    if op == "$not":
+        return not _truthy(evl()[0])
+    if op == "$in":
+        value, array = evl()
+        return any(_compare(value, item) == 0 for item in (array or []))
+    if op == "$concat":
+        values = evl()
+        return None if any(v is None for v in values) else "".join(values)
+    if op in ("$toLower", "$toUpper"):
+        value = ev(args[0] if isinstance(args, list) else args)
+        if value is None:
+            return ""
+        return str(value).lower() if op == "$toLower" else str(value).upper()
+    if op == "$toString":
+        value = ev(args)
+        return None if value is None else str(value)
+    if op == "$arrayElemAt":
+        array, index = evl()
+        try:
+            return array[index]
+        except (IndexError, TypeError):
+            return _MISSING
+    if op == "$first":
+        value = ev(args)
+        return value[0] if isinstance(value, list) and value else _MISSING
+    if op == "$objectToArray":
+        value = ev(args)
+        return [{"k": k, "v": v} for k, v in (value or {}).items()]
+    if op == "$arrayToObject":
+        value = ev(args[0] if isinstance(args, list) and len(args) == 1 else args)
+        result = {}
+        for item in value or []:
+            if isinstance(item, dict):
+                result[item["k"]] = item["v"]
+            else:
+                result[item[0]] = item[1]
+        return result
+    if op == "$map":
+        name = args.get("as", "this")
+        return [
+            evaluate(args["in"], doc, {**variables, name: item}) for item in (ev(args["input"]) or [])
+        ]
+    if op == "$filter":
+        name = args.get("as", "this")
+        return [
+            item
+            for item in (ev(args["input"]) or [])
+            if _truthy(evaluate(args["cond"], doc, {**variables, name: item}))
+        ]
+    raise OperationFailure(f"memory backend: unsupported expression operator {op}")
+
+
+def _truthy(value) -> bool:
+    return value not in (None, False, 0, _MISSING)
+
+
+def evaluate(expr, doc, variables: Optional[dict] = None):
+    """Evaluate an aggregation expression against a document."""
+    variables = variables or {}
+    if isinstance(expr, str) and expr.startswith("$$"):
+        name, _, path = expr[2:].partition(".")
+        if name == "NOW":
+            base = variables.get("NOW") or datetime.utcnow()
+        elif name in ("ROOT", "CURRENT"):
+            base = doc
+        elif name in variables:
+            base = variables[name]
+        else:
+            raise OperationFailure(f"memory backend: unknown variable $${name}")
+        return _get_path(base, path) if path else base
+    if isinstance(expr, str) and expr.startswith("$"):
+        value = _get_path(doc, expr[1:])
+        return None if value is _MISSING else value
+    if isinstance(expr, list):
+        return [evaluate(e, doc, variables) for e in expr]
+    if isinstance(expr, dict):
+        if len(expr) == 1:
+            (key, args), = expr.items()
+            if key.startswith("$"):
+                return _operator(key, args, doc, variables)
+        return {k: evaluate(v, doc, variables) for k, v in expr.items()}
+    return expr
+
+
+# --- Updates ---
+
+def _apply_update(doc: dict, update, inserting: bool = False) -> dict:
+    if isinstance(update, list):
+        # Pipeline-style update: only document-shaping stages are allowed
+        now = datetime.utcnow()
+        for stage in update:
+            (name, spec), = stage.items()
+            if name in ("$set", "$addFields"):
+                computed = {k: evaluate(v, doc, {"NOW": now}) for k, v in spec.items()}
+                for k, v in computed.items():
+                    _set_path(doc, k, v)
+            elif name == "$unset":
+                for k in [spec] if isinstance(spec, str) else spec:
+                    _unset_path(doc, k)
+            elif name == "$replaceRoot":
+                replacement = evaluate(spec["newRoot"], doc, {"NOW": now})
+                replacement.setdefault("_id", doc.get("_id"))
+                doc.clear()
+                doc.update(replacement)
+            else:
+                raise OperationFailure(f"memory backend: unsupported update stage {name}")
+        return doc
+
+    if update and not any(k.startswith("$") for k in update):
+        # Replacement document
+        replacement = _copy(update)
+        replacement["_id"] = doc.get("_id", replacement.get("_id"))
+        doc.clear()
+        doc.update(replacement)
+        return doc
+
+    for op, fields in update.items():
+        for path, value in fields.items():
+            current = _get_path(doc, path)
+            if op == "$set":
+                _set_path(doc, path, _copy(value))
+            elif op == "$setOnInsert":
+                if inserting:
+                    _set_path(doc, path, _copy(value))
+            elif op == "$unset":
+                _unset_path(doc, path)
+            elif op == "$inc":
+                _set_path(doc, path, (0 if current is _MISSING else current) + value)
+            elif op in ("$min", "$max"):
+                order = 0 if current is _MISSING else _compare(value, current)
+                if current is _MISSING or (order < 0 if op == "$min" else order > 0):
+                    _set_path(doc, path, _copy(value))
+            elif op == "$push":
+                items = value["$each"] if isinstance(value, dict) and "$each" in value else [value]
+                _set_path(doc, path, (current if isinstance(current, list) else []) + _copy(items))
+            elif op == "$addToSet":
+                items = value["$each"] if isinstance(value, dict) and "$each" in value else [value]
+                array = current if isinstance(current, list) else []
+                for item in items:
+                    if not any(_compare(item, existing) == 0 for existing in array):
+                        array = array + [_copy(item)]
+                _set_path(doc, path, array)
+            elif op == "$pull":
+                if isinstance(current, list):
+                    _set_path(doc, path, [v for v in current if not _match_field(v, value, doc)])
+            elif op == "$currentDate":
+                _set_path(doc, path, datetime.utcnow())
+            else:
+                raise OperationFailure(f"memory backend: unsupported update operator {op}")
+    return doc
+
+
+def _upsert_seed(query: Optional[dict]) -> dict:
+    """Equality fields of a filter become the base of an upserted document."""
+    seed: Dict[str, Any] = {}
+    for key, condition in (query or {}).items():
+        if key == "$and":
+            for sub in condition:
+                seed.update(_upsert_seed(sub))
+        elif key.startswith("$"):
+            continue
+        elif isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+            if "$eq" in condition:
+                _set_path(seed, key, _copy(condition["$eq"]))
+        else:
+            _set_path(seed, key, _copy(condition))
+    return seed
+
+
+# --- Results ---
+
+class InsertOneResult:
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+        self.acknowledged = True
+
+
+class InsertManyResult:
+    def __init__(self, inserted_ids):
+        self.inserted_ids = inserted_ids
+        self.acknowledged = True
+
+
+class UpdateResult:
+    def __init__(self, matched_count, modified_count, upserted_id=None):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_id = upserted_id
+        self.acknowledged = True
+
+
+class DeleteResult:
+    def __init__(self, deleted_count):
+        self.deleted_count = deleted_count
+        self.acknowledged = True
+
+
+class BulkWriteResult:
+    def __init__(self, counts: Dict[str, int], upserted_ids: Dict[int, Any]):
+        self.inserted_count = counts["inserted"]
+        self.matched_count = counts["matched"]
+        self.modified_count = counts["modified"]
+        self.deleted_count = counts["deleted"]
+        self.upserted_count = len(upserted_ids)
+        self.upserted_ids = upserted_ids
+        self.acknowledged = True
+
+
+# --- Indexes ---
+
+class _Index:
+    def __init__(self, name: str, keys: List[Tuple[str, int]], unique: bool, sparse: bool):
+        self.name = name
+        self.keys = keys
+        self.fields = [field for field, _ in keys]
+        self.unique = unique
+        self.sparse = sparse
+        # prefixes[n - 1] maps the first n key values to ids, so compound
+        # indexes also serve queries on a leading subset of their fields
+        self.prefixes: List[Dict[Any, set]] = [{} for _ in self.fields]
+
+    @property
+    def entries(self) -> Dict[Any, set]:
+        return self.prefixes[-1]
+
+    def key_for(self, doc: dict):
+        """All index keys for a doc; an array field yields one key per element (multikey)."""
+        values = [_get_path(doc, field) for field in self.fields]
+        if self.sparse and all(v is _MISSING for v in values):
+            return _MISSING
+        options = [
+            [_hashable(e) for e in v] or [None] if isinstance(v, list) else [_hashable(None if v is _MISSING else v)]
+            for v in values
+        ]
+        return list(itertools.product(*options))
+
+    def add(self, key, doc_id):
+        if key is _MISSING:
+            return
+        for k in key:
+            for n, entries in enumerate(self.prefixes, start=1):
+                entries.setdefault(k[:n], set()).add(doc_id)
+
+    def remove(self, key, doc_id):
+        if key is _MISSING:
+            return
+        for k in key:
+            for n, entries in enumerate(self.prefixes, start=1):
+                ids = entries.get(k[:n])
+                if ids:
+                    ids.discard(doc_id)
+                    if not ids:
+                        del entries[k[:n]]
+
+    def conflicts(self, key, doc_id) -> bool:
+        if not self.unique or key is _MISSING:
+            return False
+        return any(self.entries.get(k, set()) - {doc_id} for k in key)
+
+    def info(self) -> dict:
+        info = {"key": dict(self.keys)}
+        if self.unique:
+            info["unique"] = True
+        if self.sparse:
+            info["sparse"] = True
+        return info
+
+
+# --- Cursor ---
+
+class Cursor:
+    """Lazy find() result supporting sort/skip/limit chaining like pymongo."""
+
+    def __init__(self, collection, query, projection):
+        self._collection = collection
+        self._query = query
+        self._projection = projection
+        self._sort: List[Tuple[str, int]] = []
+        self._skip = 0
+        self._limit = 0
+        self._results = None
+
+    def sort(self, key_or_list, direction=None):
+        self._sort = _normalize_sort(key_or_list, direction)
+        return self
+
+    def skip(self, n: int):
+        self._skip = n
+        return self
+
+    def limit(self, n: int):
+        self._limit = n
+        return self
+
+    def _materialize(self):
+        if self._results is None:
+            collection = self._collection
+            docs = collection.database.client._run_command(
+                collection.database.name,
+                "find",
+                {"find": collection.name, "filter": self._query},
+                lambda: [
+                    _project(d, self._projection)
+                    for d in collection._find_docs(self._query, self._sort, self._skip, self._limit)
+                ],
+            )
+            self._results = iter(docs)
+        return self._results
+
+    def explain(self) -> dict:
+        plan = self._collection._plan(self._query)
+        return {"queryPlanner": {"winningPlan": plan}}
+
+    def close(self):
+        self._results = iter(())
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._materialize())
+
+
+class CommandCursor:
+    def __init__(self, docs: Iterable[dict]):
+        docs = list(docs)
+        self._size = len(docs)
+        self._docs = iter(docs)
+
+    def close(self):
+        self._docs = iter(())
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._docs)
+
+
+def _project(doc: dict, projection, variables: Optional[dict] = None) -> dict:
+    if not projection:
+        return _copy(doc)
+    if isinstance(projection, (list, tuple)):
+        projection = {field: 1 for field in projection}
+    include_id = bool(projection.get("_id", 1))
+    fields = {k: v for k, v in projection.items() if k != "_id"}
+    if all(not v for v in projection.values()):
+        # Exclusion projection, including a bare {"_id": 0}
+        result = _copy(doc)
+        for field in fields:
+            _unset_path(result, field)
+        if not include_id:
+            result.pop("_id", None)
+        return result
+    result: Dict[str, Any] = {}
+    if include_id and "_id" in doc:
+        result["_id"] = doc["_id"]
+    for field, spec in fields.items():
+        if spec is True or spec == 1:
+            value = _get_path(doc, field)
+            if value is not _MISSING:
+                _set_path(result, field, _copy(value))
+        elif spec:
+            _set_path(result, field, evaluate(spec, doc, variables))
+    return result
+
+
+# --- Command monitoring ---
+
+class _CommandEvent:
+    """Minimal stand-in for pymongo's CommandStarted/Succeeded/FailedEvent."""
+
+    def __init__(self, request_id: int, command_name: str, command: dict, database_name: str):
+        self.request_id = request_id
+        self.operation_id = request_id
+        self.command_name = command_name
+        self.command = command
+        self.database_name = database_name
+        self.duration_micros = 0
+        self.reply: Dict[str, Any] = {}
+        self.failure: Dict[str, Any] = {}
+
+
+def _result_size(result) -> int:
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, CommandCursor):
+        return result._size
+    if isinstance(result, dict):
+        return 1
+    for attr in ("deleted_count", "modified_count"):
+        if hasattr(result, attr):
+            return getattr(result, attr)
+    if hasattr(result, "inserted_ids"):
+        return len(result.inserted_ids)
+    if hasattr(result, "inserted_id"):
+        return 1
+    return 0
+
+
+def _command(name: str, spec_key: str = "filter", filter_key: Optional[str] = None, describe=None):
+    """
+    Report a Collection method to the client's listeners as command `name`.
+    `filter_key` names where to record a filter passed as the second argument;
+    `describe` turns the first argument into what is recorded.
+    """
+
+    def wrap(method):
+        @functools.wraps(method)
+        def run(self, *args, **kwargs):
+            spec = args[0] if args else kwargs.get("filter", kwargs.get("pipeline"))
+            command = {name: self.name, spec_key: describe(spec) if describe else spec}
+            if filter_key:
+                command[filter_key] = args[1] if len(args) > 1 else kwargs.get("filter")
+            return self.database.client._run_command(
+                self.database.name, name, command, lambda: method(self, *args, **kwargs)
+            )
+
+        return run
+
+    return wrap
+
+
+def _bulk_statements(requests) -> List[dict]:
+    # Each operation as MongoDB's write commands record it: {"q": filter} or {"document": doc}
+    return [{"document": op._doc} if isinstance(op, InsertOne) else {"q": op._filter} for op in requests]
+
+
+# --- Collection ---
+
+class Collection:
+    def __init__(self, database, name: str):
+        self.database = database
+        self.name = name
+        self._docs: Dict[Any, dict] = {}
+        # Insertion sequence, used to return index hits in natural order
+        self._order: Dict[Any, int] = {}
+        self._next_seq = 0
+        self._indexes: Dict[str, _Index] = {"_id_": _Index("_id_", [("_id", 1)], True, False)}
+
+    @property
+    def _lock(self):
+        return self.database._lock
+
+    # Index management
+
+    def create_index(self, keys, unique: bool = False, sparse: bool = False, name: Optional[str] = None, **kwargs):
+        spec = _normalize_sort(keys, 1)
+        name = name or "_".join(f"{field}_{direction}" for field, direction in spec)
+        with self._lock:
+            if name in self._indexes:
+                return name
+            index = _Index(name, spec, unique, sparse)
+            for doc_id, doc in self._docs.items():
+                key = index.key_for(doc)
+                if index.conflicts(key, doc_id):
+                    raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {name}")
+                index.add(key, doc_id)
+            self._indexes[name] = index
+        return name
+
+    def drop_index(self, name: str):
+        with self._lock:
+            self._indexes.pop(name, None)
+
+    def index_information(self) -> Dict[str, dict]:
+        with self._lock:
+            return {name: index.info() for name, index in self._indexes.items()}
+
+    # Internal storage primitives (callers hold the lock)
+
+    def _check_unique(self, doc: dict, doc_id):
+        for index in self._indexes.values():
+            if index.conflicts(index.key_for(doc), doc_id):
+                raise DuplicateKeyError(
+                    f"E11000 duplicate key error collection: {self.name} index: {index.name}",
+                    11000,
+                    {"keyValue": {field: _get_path(doc, field) for field, _ in index.keys}},
+                )
+
+    def _insert_doc(self, doc: dict):
+        doc = _copy(doc)
+        doc.setdefault("_id", ObjectId())
+        doc_id = _hashable(doc["_id"])
+        if doc_id in self._docs:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: _id_", 11000)
+        self._check_unique(doc, doc_id)
+        self._docs[doc_id] = doc
+        self._order[doc_id] = self._next_seq
+        self._next_seq += 1
+        for index in self._indexes.values():
+            index.add(index.key_for(doc), doc_id)
+        return doc["_id"]
+
+    def _replace_doc(self, doc_id, new_doc: dict):
+        old = self._docs[doc_id]
+        self._check_unique(new_doc, doc_id)
+        for index in self._indexes.values():
+            index.remove(index.key_for(old), doc_id)
+            index.add(index.key_for(new_doc), doc_id)
+        self._docs[doc_id] = new_doc
+
+    def _delete_doc(self, doc_id):
+        old = self._docs.pop(doc_id)
+        del self._order[doc_id]
+        for index in self._indexes.values():
+            index.remove(index.key_for(old), doc_id)
+
+    def _usable_index(self, query: Optional[dict]) -> Optional[Tuple[_Index, List[Any]]]:
+        """
+        Find the index with the longest leading run of fields that have equality
+        (or $in) conditions in the query, with the candidate values per field.
+        """
+        if not query:
+            return None
+        best = None
+        for index in self._indexes.values():
+            values = []
+            for field in index.fields:
+                if field not in query:
+                    break
+                condition = query[field]
+                if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+                    if set(condition) == {"$eq"}:
+                        values.append([condition["$eq"]])
+                    elif set(condition) == {"$in"}:
+                        values.append(list(condition["$in"]))
+                    else:
+                        break
+                elif isinstance(condition, (dict, list)) or hasattr(condition, "pattern"):
+                    break
+                else:
+                    values.append([condition])
+            if not values:
+                continue
+            if index.sparse and any(v is None for options in values for v in options):
+                # Sparse indexes leave out missing fields, which {field: None} must still match
+                continue
+            if best is None or len(values) > len(best[1]):
+                best = (index, values)
+        return best
+
+    def _or_branches(self, query) -> Optional[List[dict]]:
+        # {"$or": [...]} where every branch can use an index is answered as a union of lookups
+        if query and set(query) == {"$or"} and all(self._usable_index(b) for b in query["$or"]):
+            return query["$or"]
+        return None
+
+    def _plan(self, query) -> dict:
+        branches = self._or_branches(query)
+        if branches:
+            return {"stage": "FETCH", "inputStage": {"stage": "OR", "inputStages": [self._plan(b)["inputStage"] for b in branches]}}
+        usable = self._usable_index(query)
+        if not usable:
+            return {"stage": "COLLSCAN"}
+        index, values = usable
+        # Same shape as MongoDB's: fields past the matched prefix are unbounded
+        bounds = {
+            field: [f"[{v!r}, {v!r}]" for v in values[n]] if n < len(values) else ["[MinKey, MaxKey]"]
+            for n, field in enumerate(index.fields)
+        }
+        return {
+            "stage": "FETCH",
+            "inputStage": {
+                "stage": "IXSCAN", "indexName": index.name, "keyPattern": dict(index.keys), "indexBounds": bounds
+            },
+        }
+
+    def _candidate_ids(self, query):
+        usable = self._usable_index(query)
+        if not usable:
+            return list(self._docs)
+        index, values = usable
+        keys = [()]
+        for options in values:
+            keys = [k + (_hashable(v),) for k in keys for v in options]
+        entries = index.prefixes[len(values) - 1]
+        ids = set()
+        for key in keys:
+            ids |= entries.get(key, set())
+        return sorted(ids, key=self._order.__getitem__)
+
+    def _matching_ids(self, query) -> List[Any]:
+        branches = self._or_branches(query)
+        if branches:
+            ids = set()
+            for branch in branches:
+                ids.update(doc_id for doc_id in self._candidate_ids(branch) if match(self._docs[doc_id], branch))
+            return sorted(ids, key=self._order.__getitem__)
+        return [doc_id for doc_id in self._candidate_ids(query) if match(self._docs[doc_id], query)]
+
+    def _find_docs(self, query, sort=None, skip: int = 0, limit: int = 0) -> List[dict]:
+        with self._lock:
+            docs = [self._docs[doc_id] for doc_id in self._matching_ids(query)]
+            if sort:
+                docs = _sort_docs(list(docs), sort)
+            if skip:
+                docs = docs[skip:]
+            if limit:
+                docs = docs[:limit]
+            return [_copy(d) for d in docs]
+
+    # Reads
+
+    def find(self, filter=None, projection=None, sort=None, skip: int = 0, limit: int = 0, session=None, **kwargs):
+        cursor = Cursor(self, filter or {}, projection)
+        if sort:
+            cursor.sort(sort)
+        return cursor.skip(skip).limit(limit)
+
+    def find_one(self, filter=None, projection=None, sort=None, session=None, **kwargs):
+        if filter is not None and not isinstance(filter, dict):
+            filter = {"_id": filter}
+        return next(self.find(filter, projection, sort=sort, limit=1), None)
+
+    @_command("count", "query")
+    def count_documents(self, filter, session=None, **kwargs) -> int:
+        with self._lock:
+            return len(self._matching_ids(filter))
+
+    def estimated_document_count(self, **kwargs) -> int:
+        with self._lock:
+            return len(self._docs)
+
+    @_command("distinct", "key", "query")
+    def distinct(self, key: str, filter=None, session=None):
+        values: List[Any] = []
+        for doc in self._find_docs(filter or {}):
+            value = _get_path(doc, key)
+            for item in value if isinstance(value, list) else [value]:
+                if item is not _MISSING and not any(_compare(item, v) == 0 for v in values):
+                    values.append(item)
+        return values
+
+    # Writes
+
+    @_command("insert", "documents")
+    def insert_one(self, document: dict, session=None, **kwargs):
+        with self._lock:
+            inserted_id = self._insert_doc(document)
+        document.setdefault("_id", inserted_id)
+        return InsertOneResult(inserted_id)
+
+    @_command("insert", "documents")
+    def insert_many(self, documents, ordered: bool = True, session=None, **kwargs):
+        documents = list(documents)
+        inserted, errors = [], []
+        with self._lock:
+            for i, document in enumerate(documents):
+                try:
+                    inserted_id = self._insert_doc(document)
+                    document.setdefault("_id", inserted_id)
+                    inserted.append(inserted_id)
+                except DuplicateKeyError as exc:
+                    errors.append({"index": i, "code": 11000, "errmsg": str(exc), "op": document,
+                                   "keyValue": (exc.details or {}).get("keyValue", {})})
+                    if ordered:
+                        break
+        if errors:
+            raise BulkWriteError(
+                {"writeErrors": errors, "nInserted": len(inserted), "writeConcernErrors": [], "nUpserted": 0,
+                 "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": []}
+            )
+        return InsertManyResult(inserted)
+
+    def _update(self, filter, update, upsert: bool, multi: bool):
+        with self._lock:
+            ids = self._matching_ids(filter)
+            if not multi:
+                ids = ids[:1]
+            modified = 0
+            for doc_id in ids:
+                old = self._docs[doc_id]
+                new = _apply_update(_copy(old), update)
+                if new != old:
+                    self._replace_doc(doc_id, new)
+                    modified += 1
+            if ids or not upsert:
+                return UpdateResult(len(ids), modified)
+            doc = _apply_update(_upsert_seed(filter), update, inserting=True)
+            return UpdateResult(0, 0, self._insert_doc(doc))
+
+    @_command("update", "q")
+    def update_one(self, filter, update, upsert: bool = False, session=None, **kwargs):
+        return self._update(filter, update, upsert, multi=False)
+
+    @_command("update", "q")
+    def update_many(self, filter, update, upsert: bool = False, session=None, **kwargs):
+        return self._update(filter, update, upsert, multi=True)
+
+    @_command("update", "q")
+    def replace_one(self, filter, replacement, upsert: bool = False, session=None, **kwargs):
+        return self._update(filter, replacement, upsert, multi=False)
+
+    @_command("delete", "q")
+    def delete_one(self, filter, session=None, **kwargs):
+        with self._lock:
+            ids = self._matching_ids(filter)[:1]
+            for doc_id in ids:
+                self._delete_doc(doc_id)
+        return DeleteResult(len(ids))
+
+    @_command("delete", "q")
+    def delete_many(self, filter, session=None, **kwargs):
+        with self._lock:
+            ids = self._matching_ids(filter)
+            for doc_id in ids:
+                self._delete_doc(doc_id)
+        return DeleteResult(len(ids))
+
+    @_command("findAndModify", "query")
+    def find_one_and_update(
+        self, filter, update, projection=None, sort=None, upsert: bool = False,
+        return_document: bool = False, session=None, **kwargs
+    ):
+        with self._lock:
+            ids = self._matching_ids(filter)
+            if sort and ids:
+                ordered = _sort_docs([self._docs[i] for i in ids], _normalize_sort(sort))
+                ids = [_hashable(ordered[0]["_id"])]
+            if ids:
+                doc_id = ids[0]
+                before = _copy(self._docs[doc_id])
+                after = _apply_update(_copy(before), update)
+                self._replace_doc(doc_id, after)
+                result = after if return_document else before
+            elif upsert:
+                doc = _apply_update(_upsert_seed(filter), update, inserting=True)
+                inserted_id = self._insert_doc(doc)
+                result = self._docs[_hashable(inserted_id)] if return_document else None
+            else:
+                result = None
+            return _project(result, projection) if result is not None else None
+
+    def find_one_and_replace(self, filter, replacement, **kwargs):
+        return self.find_one_and_update(filter, replacement, **kwargs)
+
+    @_command("findAndModify", "query")
+    def find_one_and_delete(self, filter, projection=None, sort=None, session=None, **kwargs):
+        with self._lock:
+            ids = self._matching_ids(filter)
+            if not ids:
+                return None
+            if sort:
+                ordered = _sort_docs([self._docs[i] for i in ids], _normalize_sort(sort))
+                ids = [_hashable(ordered[0]["_id"])]
+            doc = self._docs[ids[0]]
+            self._delete_doc(ids[0])
+            return _project(doc, projection)
+
+    @_command("bulkWrite", "ops", describe=_bulk_statements)
+    def bulk_write(self, requests, ordered: bool = True, session=None, **kwargs):
+        counts = {"inserted": 0, "matched": 0, "modified": 0, "deleted": 0}
+        upserted: Dict[int, Any] = {}
+        errors = []
+        with self._lock:
+            for i, op in enumerate(requests):
+                try:
+                    if isinstance(op, InsertOne):
+                        self._insert_doc(op._doc)
+                        counts["inserted"] += 1
+                    elif isinstance(op, (UpdateOne, UpdateMany, ReplaceOne)):
+                        result = self._update(op._filter, op._doc, op._upsert, multi=isinstance(op, UpdateMany))
+                        counts["matched"] += result.matched_count
+                        counts["modified"] += result.modified_count
+                        if result.upserted_id is not None:
+                            upserted[i] = result.upserted_id
+                    elif isinstance(op, (DeleteOne, DeleteMany)):
+                        result = (self.delete_many if isinstance(op, DeleteMany) else self.delete_one)(op._filter)
+                        counts["deleted"] += result.deleted_count
+                    else:
+                        raise OperationFailure(f"memory backend: unsupported bulk operation {op!r}")
+                except DuplicateKeyError as exc:
+                    errors.append({"index": i, "code": 11000, "errmsg": str(exc)})
+                    if ordered:
+                        break
+        if errors:
+            raise BulkWriteError(
+                {"writeErrors": errors, "nInserted": counts["inserted"], "nMatched": counts["matched"],
+                 "nModified": counts["modified"], "nRemoved": counts["deleted"],
+                 "nUpserted": len(upserted), "upserted": [], "writeConcernErrors": []}
+            )
+        return BulkWriteResult(counts, upserted)
+
+    def drop(self, session=None):
+        self.database.drop_collection(self.name)
+
+    # Aggregation
+
+    @_command("aggregate", "pipeline")
+    def aggregate(self, pipeline, session=None, **kwargs):
+        pipeline = list(pipeline)
+        # A leading $match can be served from the indexes
+        if pipeline and "$match" in pipeline[0] and "$expr" not in pipeline[0]["$match"]:
+            docs = self._find_docs(pipeline.pop(0)["$match"])
+        else:
+            docs = self._find_docs({})
+        return CommandCursor(run_pipeline(self.database, docs, pipeline))
+
+    def watch(self, *args, **kwargs):
+        raise OperationFailure("memory backend: change streams are not supported")
+
+
+# --- Aggregation pipeline ---
+
+def _accumulate(op: str, expr, docs: List[dict]):
+    if op == "$count":
+        return len(docs)
+    values = [evaluate(expr, d) for d in docs]
+    if op == "$sum":
+        return sum(_numbers(values))
+    if op == "$avg":
+        nums = _numbers(values)
+        return sum(nums) / len(nums) if nums else None
+    if op in ("$min", "$max"):
+        present = [v for v in values if v is not None]
+        if not present:
+            return None
+        return (min if op == "$min" else max)(present, key=_sort_key)
+    if op == "$first":
+        return values[0] if values else None
+    if op == "$last":
+        return values[-1] if values else None
+    if op == "$push":
+        return values
+    if op == "$addToSet":
+        unique: List[Any] = []
+        for v in values:
+            if not any(_compare(v, u) == 0 for u in unique):
+                unique.append(v)
+        return unique
+    raise OperationFailure(f"memory backend: unsupported accumulator {op}")
+
+
+def _stage_group(docs, spec):
+    groups: Dict[Any, List[dict]] = {}
+    keys: Dict[Any, Any] = {}
+    for doc in docs:
+        key = evaluate(spec["_id"], doc)
+        hashed = _hashable(key)
+        groups.setdefault(hashed, []).append(doc)
+        keys.setdefault(hashed, key)
+    results = []
+    for hashed, members in groups.items():
+        row = {"_id": keys[hashed]}
+        for field, accumulator in spec.items():
+            if field == "_id":
+                continue
+            (op, expr), = accumulator.items()
+            row[field] = _accumulate(op, expr, members)
+        results.append(row)
+    return results
+
+
+def _stage_lookup(database, docs, spec):
+    foreign = database[spec["from"]]
+    if "pipeline" in spec:
+        results = []
+        for doc in docs:
+            variables = {name: evaluate(expr, doc) for name, expr in spec.get("let", {}).items()}
+            joined = run_pipeline(database, foreign._find_docs({}), spec["pipeline"], variables)
+            results.append({**doc, spec["as"]: list(joined)})
+        return results
+    local_field, foreign_field = spec["localField"], spec["foreignField"]
+    with database._lock:
+        by_key: Dict[Any, List[dict]] = {}
+        for fdoc in foreign._docs.values():
+            value = _get_path(fdoc, foreign_field)
+            for item in value if isinstance(value, list) else [value]:
+                by_key.setdefault(_hashable(None if item is _MISSING else item), []).append(_copy(fdoc))
+    results = []
+    for doc in docs:
+        value = _get_path(doc, local_field)
+        matches: List[dict] = []
+        for item in value if isinstance(value, list) else [value]:
+            matches.extend(by_key.get(_hashable(None if item is _MISSING else item), []))
+        results.append({**doc, spec["as"]: matches})
+    return results
+
+
+def _stage_unwind(docs, spec):
+    if isinstance(spec, str):
+        spec = {"path": spec}
+    path = spec["path"][1:]
+    keep_empty = spec.get("preserveNullAndEmptyArrays", False)
+    results = []
+    for doc in docs:
+        value = _get_path(doc, path)
+        if isinstance(value, list) and value:
+            for item in value:
+                copy = _copy(doc)
+                _set_path(copy, path, item)
+                results.append(copy)
+        elif isinstance(value, list) or value is _MISSING or value is None:
+            if keep_empty:
+                copy = _copy(doc)
+                _unset_path(copy, path)
+                results.append(copy)
+        else:
+            results.append(doc)
+    return results
+
+
+def _stage_merge(database, docs, spec):
+    if isinstance(spec, str):
+        spec = {"into": spec}
+    target = database[spec["into"] if isinstance(spec["into"], str) else spec["into"]["coll"]]
+    on = spec.get("on", "_id")
+    on = [on] if isinstance(on, str) else list(on)
+    when_matched = spec.get("whenMatched", "merge")
+    when_not_matched = spec.get("whenNotMatched", "insert")
+    with database._lock:
+        for doc in docs:
+            query = {field: _get_path(doc, field) for field in on}
+            ids = target._matching_ids(query)
+            if ids:
+                if when_matched == "keepExisting":
+                    continue
+                if when_matched == "fail":
+                    raise DuplicateKeyError(f"$merge found an existing document in {target.name}", 11000)
+                existing = target._docs[ids[0]]
+                fields = {k: v for k, v in doc.items() if k != "_id"}
+                if isinstance(when_matched, list):
+                    new_doc = _apply_update(_copy(existing), when_matched)
+                elif when_matched == "replace":
+                    new_doc = {"_id": existing["_id"], **fields}
+                else:
+                    new_doc = {**_copy(existing), **fields}
+                target._replace_doc(ids[0], new_doc)
+            elif when_not_matched == "insert":
+                target._insert_doc(doc)
+            elif when_not_matched == "fail":
+                raise OperationFailure(f"$merge could not find a matching document in {target.name}")
+    return []
+
+
+def _stage_out(database, docs, name):
+    target = database[name]
+    with database._lock:
+        for doc_id in list(target._docs):
+            target._delete_doc(doc_id)
+        for doc in docs:
+            target._insert_doc(doc)
+    return []
+
+
+def run_pipeline(database, docs: List[dict], pipeline: List[dict], variables: Optional[dict] = None):
+    variables = dict(variables or {})
+    variables.setdefault("NOW", datetime.utcnow())
+    for stage in pipeline:
+        (name, spec), = stage.items()
+        if name == "$match":
+            docs = [d for d in docs if match(d, spec, variables)]
+        elif name == "$project":
+            docs = [_project(d, spec, variables) for d in docs]
+        elif name in ("$addFields", "$set"):
+            for d in docs:
+                computed = {k: evaluate(v, d, variables) for k, v in spec.items()}
+                for k, v in computed.items():
+                    _set_path(d, k, v)
+        elif name == "$unset":
+            for d in docs:
+                for field in [spec] if isinstance(spec, str) else spec:
+                    _unset_path(d, field)
+        elif name == "$group":
+            docs = _stage_group(docs, spec)
+        elif name == "$sort":
+            docs = _sort_docs(list(docs), _normalize_sort(spec))
+        elif name == "$skip":
+            docs = docs[spec:]
+        elif name == "$limit":
+            docs = docs[:spec]
+        elif name == "$count":
+            docs = [{spec: len(docs)}] if docs else []
+        elif name == "$lookup":
+            docs = _stage_lookup(database, docs, spec)
+        elif name == "$unwind":
+            docs = _stage_unwind(docs, spec)
+        elif name in ("$replaceRoot", "$replaceWith"):
+            expr = spec["newRoot"] if name == "$replaceRoot" else spec
+            docs = [evaluate(expr, d, variables) for d in docs]
+        elif name == "$facet":
+            docs = [{key: list(run_pipeline(database, _copy(docs), sub, variables)) for key, sub in spec.items()}]
+        elif name == "$merge":
+            docs = _stage_merge(database, docs, spec)
+        elif name == "$out":
+            docs = _stage_out(database, docs, spec if isinstance(spec, str) else spec["coll"])
+        else:
+            raise OperationFailure(f"memory backend: unsupported aggregation stage {name}")
+    return docs
+
+
+# --- Database / client ---
+
+class _TopologyDescription:
+    topology_type_name = "Single"
+
+
+class MemoryClient:
+    """Stand-in for MongoClient; each client holds its own set of databases."""
+
+    def __init__(self, event_listeners=None):
+        self._databases: Dict[str, "MemoryDatabase"] = {}
+        self._lock = threading.RLock()
+        self.topology_description = _TopologyDescription()
+        self._listeners = list(event_listeners or [])
+        self._request_ids = itertools.count(1)
+        # Nested calls (bulk_write -> delete_many, $merge...) report only the outer command
+        self._in_command = threading.local()
+
+    def _run_command(self, database_name: str, command_name: str, command: dict, fn):
+        if not self._listeners or getattr(self._in_command, "active", False):
+            return fn()
+        event = _CommandEvent(next(self._request_ids), command_name, command, database_name)
+        for listener in self._listeners:
+            listener.started(event)
+        self._in_command.active = True
+        start = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as exc:
+            event.duration_micros = int((time.perf_counter() - start) * 1e6)
+            event.failure = {"errmsg": str(exc)}
+            for listener in self._listeners:
+                listener.failed(event)
+            raise
+        finally:
+            self._in_command.active = False
+        event.duration_micros = int((time.perf_counter() - start) * 1e6)
+        event.reply = {"n": _result_size(result)}
+        for listener in self._listeners:
+            listener.succeeded(event)
+        return result
+
+    def __getitem__(self, name: str) -> "MemoryDatabase":
+        with self._lock:
+            if name not in self._databases:
+                self._databases[name] = MemoryDatabase(self, name)
+            return self._databases[name]
+
+    def get_database(self, name: str) -> "MemoryDatabase":
+        return self[name]
+
+    def drop_database(self, name):
+        # Empty it in place so handles such as db.get_db()'s cached one stay valid
+        with self._lock:
+            database = self._databases.get(getattr(name, "name", name))
+        if database is not None:
+            with database._lock:
+                database._collections.clear()
+
+    def start_session(self, **kwargs):
+        raise OperationFailure("memory backend: sessions and transactions are not supported")
+
+    def close(self):
+        pass
+
+
+class MemoryDatabase:
+    def __init__(self, client: MemoryClient, name: str):
+        self.client = client
+        self.name = name
+        self._lock = threading.RLock()
+        self._collections: Dict[str, Collection] = {}
+
+    def __getitem__(self, name: str) -> Collection:
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = Collection(self, name)
+            return self._collections[name]
+
+    def __getattr__(self, name: str) -> Collection:
+        if name.startswith("_"):
+            # Same rule as pymongo: use db["_name"] for underscore collections
+            raise AttributeError(name)
+        return self[name]
+
+    def get_collection(self, name: str) -> Collection:
+        return self[name]
+
+    def list_collection_names(self) -> List[str]:
+        with self._lock:
+            return list(self._collections)
+
+    def drop_collection(self, name):
+        with self._lock:
+            self._collections.pop(getattr(name, "name", name), None)
+
+    def command(self, command, *args, **kwargs):
+        name = command if isinstance(command, str) else next(iter(command))
+        if name == "ping":
+            return {"ok": 1.0}
+        raise OperationFailure(f"memory backend: unsupported command {name}")
@@ -0,0 +1,90 @@
+"""
+Concurrent page-data loading.
+
+A view declares the independent reads it needs as {name: callable} and
+load_page_data() runs them together on a shared thread pool (pymongo
+clients are thread-safe), so a page waits for its slowest read instead of
+the sum of all of them. Each read runs with the caller's event, causal
+token and query profile, and its duration is recorded in the profile.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict
+
+import streamlit as st
+
+import db
+
+# Threads when the client reports no connection pool size (the memory backend)
+PAGE_LOAD_WORKERS = 8
+PAGE_LOAD_TIMEOUT = 10.0
+
+
+class PageLoadTimeout(TimeoutError):
+    """Some reads did not finish before the deadline."""
+
+    def __init__(self, pending):
+        self.pending = sorted(pending)
+        super().__init__(f"Timed out loading: {', '.join(self.pending)}")
+
+
+class PageData(dict):
+    """Read results by name, plus `timings` (name -> milliseconds)."""
+
+    def __init__(self):
+        super().__init__()
+        self.timings: Dict[str, float] = {}
+
+
+def _pool_size() -> int:
+    try:
+        size = db.get_db().client.options.pool_options.max_pool_size
+    except AttributeError:
+        size = None
+    return size or PAGE_LOAD_WORKERS
+
+
+@st.cache_resource
+def _get_pool() -> ThreadPoolExecutor:
+    # Shared by all sessions and as large as the client's maxPoolSize, so a read
+    # waits for a thread only when it would have waited for a connection anyway
+    # (threads are started on demand)
+    return ThreadPoolExecutor(max_workers=_pool_size(), thread_name_prefix="page-data")
+
+
+def load_page_data(reads: Dict[str, Callable[[], Any]], timeout: float = PAGE_LOAD_TIMEOUT) -> PageData:
+    """
+    Run every read concurrently and return their results by name. Raises
+    PageLoadTimeout when the deadline passes first, or the first read's error.
+    """
+    context = (db.current_event_id(), db.causal_token(), db.get_query_profile())
+    pool = _get_pool()
+    futures = {name: pool.submit(_run_read, name, fn, context) for name, fn in reads.items()}
+    _, pending = wait(futures.values(), timeout=timeout)
+    if pending:
+        for future in pending:
+            future.cancel()
+        raise PageLoadTimeout(name for name, future in futures.items() if future in pending)
+    data = PageData()
+    for name, future in futures.items():
+        data[name], data.timings[name] = future.result()
+    return data
+
+
+def _run_read(name: str, fn: Callable[[], Any], context):
+    event_id, token, profile = context
+    # Pool threads are reused, so the caller's thread-local state is set per read and cleared after
+    db.set_current_event(event_id)
+    db.bind_causal_token(token)
+    db.set_query_profile(profile)
+    start = time.perf_counter()
+    try:
+        value = fn()
+    finally:
+        ms = (time.perf_counter() - start) * 1000
+        if profile is not None:
+            profile.record_read(name, ms)
+        db.set_current_event(None)
+        db.bind_causal_token({})
+        db.set_query_profile(None)
+    return value, ms
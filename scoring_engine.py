@@ -0,0 +1,161 @@
+"""
+Judge-normalized leaderboards computed with NumPy.
+
+All submissions are pulled in one cursor into a dense judge x competitor x
+question array (NaN where a judge has not answered), and every method below
+works on whole arrays, so cost grows with the array size rather than with
+Python-level loops over rows.
+"""
+from typing import Any, Dict, List
+
+import numpy as np
+
+import db
+
+METHODS = {
+    "zscore": "Judge z-score",
+    "trimmed": "Trimmed mean",
+    "rank": "Rank aggregation",
+}
+
+TRIM_FRACTION = 0.2
+
+
+def _oid_keys(oids) -> np.ndarray:
+    # 12-byte ObjectIds as fixed-width bytes so they sort and search like the ids themselves
+    return np.array([oid.binary for oid in oids], dtype="S12")
+
+
+def _positions(sorted_keys: np.ndarray, keys: np.ndarray):
+    """Index of each key in sorted_keys, plus a mask of keys that were found."""
+    idx = np.searchsorted(sorted_keys, keys)
+    idx = np.minimum(idx, max(len(sorted_keys) - 1, 0))
+    found = sorted_keys[idx] == keys if len(sorted_keys) else np.zeros(len(keys), dtype=bool)
+    return idx, found
+
+
+@db.workload(db.ANALYTICS)
+def load_answer_tensor(database=None) -> Dict[str, Any]:
+    """
+    Dense answers array of shape (judges, competitors, questions) for the current
+    event, NaN where missing, with the competitor ids and names in axis order.
+    """
+    database, session = (database, None) if database is not None else db._reads()
+    event_id = db.current_event_id()
+    competitors = list(
+        database.competitors.find({"event_id": event_id}, {"name": 1}, session=session).sort("_id", 1)
+    )
+    judge_keys = np.sort(_oid_keys(database.judges.distinct("_id", {"event_ids": event_id}, session=session)))
+    question_keys = np.sort(_oid_keys(database.questions.distinct("_id", {"event_id": event_id}, session=session)))
+    competitor_keys = _oid_keys(c["_id"] for c in competitors)
+
+    submissions = database.submissions.find(
+        {"event_id": event_id}, {"judge_id": 1, "competitor_id": 1, "answers": 1, "_id": 0}, session=session
+    )
+    # One (judge, competitor, question, value) row per answer in the submissions' maps
+    rows = [
+        (s["judge_id"].binary, s["competitor_id"].binary, bytes.fromhex(qid), value)
+        for s in submissions
+        for qid, value in s["answers"].items()
+    ]
+    values = np.full((len(judge_keys), len(competitor_keys), len(question_keys)), np.nan)
+    if rows:
+        judge_col, competitor_col, question_col, value_col = zip(*rows)
+        j, j_ok = _positions(judge_keys, np.array(judge_col, dtype="S12"))
+        c, c_ok = _positions(competitor_keys, np.array(competitor_col, dtype="S12"))
+        q, q_ok = _positions(question_keys, np.array(question_col, dtype="S12"))
+        ok = j_ok & c_ok & q_ok
+        values[j[ok], c[ok], q[ok]] = np.array(value_col, dtype=float)[ok]
+    return {
+        "competitor_ids": [str(c["_id"]) for c in competitors],
+        "competitor_names": [c.get("name", "") for c in competitors],
+        "values": values,
+    }
+
+
+def pair_scores(values: np.ndarray) -> np.ndarray:
+    """(judges, competitors) average answer per pair, NaN where the judge gave no answers."""
+    answered = ~np.isnan(values)
+    counts = answered.sum(axis=2)
+    totals = np.where(answered, values, 0.0).sum(axis=2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, totals / counts, np.nan)
+
+
+def _nanmean(values: np.ndarray, axis: int) -> np.ndarray:
+    present = ~np.isnan(values)
+    counts = present.sum(axis=axis)
+    totals = np.where(present, values, 0.0).sum(axis=axis)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, totals / counts, np.nan)
+
+
+def zscore_scores(scores: np.ndarray) -> np.ndarray:
+    """Standardize each judge's scores (zero mean, unit spread), then average per competitor."""
+    mean = _nanmean(scores, axis=1)[:, None]
+    spread = np.sqrt(_nanmean((scores - mean) ** 2, axis=1))[:, None]
+    # A judge who gave everyone the same score carries no ranking signal
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = np.where(spread > 0, (scores - mean) / spread, 0.0)
+    return _nanmean(np.where(np.isnan(scores), np.nan, z), axis=0)
+
+
+def trimmed_scores(scores: np.ndarray, fraction: float = TRIM_FRACTION) -> np.ndarray:
+    """Mean per competitor after dropping the top and bottom `fraction` of judges' scores."""
+    ordered = np.sort(scores, axis=0)  # NaN sorts last
+    counts = (~np.isnan(scores)).sum(axis=0)
+    cut = np.floor(counts * fraction).astype(int)
+    position = np.arange(scores.shape[0])[:, None]
+    keep = (position >= cut) & (position < counts - cut)
+    return _nanmean(np.where(keep, ordered, np.nan), axis=0)
+
+
+def rank_scores(scores: np.ndarray) -> np.ndarray:
+    """
+    Each judge's scores become percentile ranks (0 = their lowest, 1 = their highest,
+    ties share the average rank); competitors get the mean percentile across judges.
+    """
+    judges, competitors = scores.shape
+    if not judges or not competitors:
+        return np.full(competitors, np.nan)
+    present = ~np.isnan(scores)
+    finite = scores[present]
+    span = (finite.max() - finite.min() + 1.0) * 2 if finite.size else 1.0
+    # Offset every judge's row into its own value band so one flat sort ranks all rows at once
+    offsets = np.arange(judges)[:, None] * span
+    keyed = np.where(present, scores - (finite.min() if finite.size else 0.0), span / 2) + offsets
+    flat = np.sort(keyed, axis=None)
+    row_start = np.arange(judges)[:, None] * competitors
+    below = np.searchsorted(flat, keyed, side="left") - row_start
+    through = np.searchsorted(flat, keyed, side="right") - row_start
+    rank = (below + through - 1) / 2.0  # zero-based average rank within the judge's row
+    scored = present.sum(axis=1)[:, None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        percentile = np.where(scored > 1, rank / (scored - 1), 0.5)
+    return _nanmean(np.where(present, percentile, np.nan), axis=0)
+
+
+def normalized_leaderboard(method: str, database=None) -> List[Dict[str, Any]]:
+    """Leaderboard rows ranked by `method` (a key of METHODS), best first."""
+    tensor = load_answer_tensor(database)
+    scores = pair_scores(tensor["values"])
+    normalized = {"zscore": zscore_scores, "trimmed": trimmed_scores, "rank": rank_scores}[method](scores)
+    judges = (~np.isnan(scores)).sum(axis=0)
+    raw = _nanmean(scores, axis=0)
+    # Unscored competitors sink to the bottom; stable sort keeps _id order among ties
+    order = np.argsort(np.where(np.isnan(normalized), np.inf, -np.round(normalized, 6)), kind="stable")
+    return [
+        {
+            "competitor_id": tensor["competitor_ids"][i],
+            "competitor_name": tensor["competitor_names"][i],
+            "num_scores": int(judges[i]),
+            "score": None if np.isnan(normalized[i]) else float(normalized[i]),
+            "avg_score": None if np.isnan(raw[i]) else float(raw[i]),
+        }
+        for i in order
+    ]
+
+
+def get_normalized_leaderboard(method: str) -> List[Dict[str, Any]]:
+    """normalized_leaderboard() cached per process until the score epoch moves; treat as read-only."""
+    return db.cached_for_epoch(f"normalized:{method}:{db.current_event_id()}", lambda: normalized_leaderboard(method))
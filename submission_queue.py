@@ -0,0 +1,183 @@
+"""
+Optional write-behind queue for judge submissions.
+
+With `write_behind = true` under [database] in secrets (or WRITE_BEHIND=1),
+"Save scores" appends the submission to a local spool file and returns at
+once; a background worker coalesces everything pending (latest submission
+per judge x competitor wins) into one save_answers_batch call. The spool is
+replayed on startup, so queued scores survive a restart of this process.
+
+The queue is per process: status and read-through only see submissions
+made through this app instance.
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import streamlit as st
+
+import db
+
+FLUSH_INTERVAL = 0.5
+RETRY_BACKOFF_MAX = 30.0
+
+Pair = Tuple[str, str]
+
+
+def _setting(name: str, env: str) -> Optional[str]:
+    try:
+        value = st.secrets.database.get(name)  # type: ignore[attr-defined]
+    except Exception:
+        value = None
+    return value if value is not None else os.environ.get(env)
+
+
+def is_write_behind_enabled() -> bool:
+    return str(_setting("write_behind", "WRITE_BEHIND") or "").lower() in ("1", "true", "yes")
+
+
+@st.cache_resource
+def get_submission_queue() -> Optional["SubmissionQueue"]:
+    """The process-wide queue, or None when write-behind is off."""
+    if not is_write_behind_enabled():
+        return None
+    spool_path = _setting("spool_path", "SUBMISSION_SPOOL") or os.path.join(".spool", "submissions.jsonl")
+    queue = SubmissionQueue(spool_path)
+    queue.start()
+    return queue
+
+
+class SubmissionQueue:
+    def __init__(self, spool_path: str, flush_interval: float = FLUSH_INTERVAL):
+        self.spool_path = spool_path
+        self.flush_interval = flush_interval
+        self._lock = threading.Condition()
+        # Held while a batch is being written so read-through never counts a submission twice
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[Pair, Dict[str, Any]] = {}
+        self._confirmed_seq: Dict[Pair, int] = {}
+        self._next_seq = 1
+        self.last_error: Optional[str] = None
+        self._replay_spool()
+
+    # Producer side
+
+    def submit(self, judge_id: Any, competitor_id: Any, answers: Dict[Any, float]) -> int:
+        """Queue a submission and spool it to disk; returns its sequence number."""
+        pair = (str(judge_id), str(competitor_id))
+        answers = {str(qid): value for qid, value in answers.items()}
+        event_id = str(db.current_event_id())
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            entry = {"seq": seq, "event_id": event_id, "judge_id": pair[0], "competitor_id": pair[1], "answers": answers}
+            self._append_spool(entry)
+            self._pending[pair] = entry
+            self._lock.notify()
+        return seq
+
+    def status(self, judge_id: Any, competitor_id: Any, seq: int) -> str:
+        """"queued" until the batch holding `seq` (or a newer submission) is written, then "confirmed"."""
+        pair = (str(judge_id), str(competitor_id))
+        with self._lock:
+            return "confirmed" if self._confirmed_seq.get(pair, 0) >= seq else "queued"
+
+    def pending_answers(self, judge_id: Any) -> Dict[str, Dict[str, float]]:
+        """Queued answers for one judge in the current event: {competitor id: {question id: value}}."""
+        judge_id, event_id = str(judge_id), str(db.current_event_id())
+        with self._lock:
+            return {
+                c: dict(e["answers"])
+                for (j, c), e in self._pending.items()
+                if j == judge_id and e["event_id"] == event_id
+            }
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    # Worker side
+
+    def start(self):
+        threading.Thread(target=self._run, name="submission-queue", daemon=True).start()
+
+    def _run(self):
+        backoff = self.flush_interval
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._lock.wait()
+            # Let a burst of saves accumulate into one batch
+            time.sleep(backoff)
+            try:
+                self.flush()
+                backoff = self.flush_interval
+            except Exception as exc:  # keep the spool and retry; the database may be down
+                self.last_error = str(exc)
+                backoff = min(backoff * 2, RETRY_BACKOFF_MAX)
+
+    def flush(self):
+        """Write everything pending in one batch."""
+        with self._flush_lock:
+            with self._lock:
+                batch = dict(self._pending)
+            if not batch:
+                return
+            db.save_answers_batch({(entry["event_id"], *pair): entry["answers"] for pair, entry in batch.items()})
+            with self._lock:
+                for pair, entry in batch.items():
+                    self._confirmed_seq[pair] = entry["seq"]
+                    # A newer submission for the pair may have arrived meanwhile
+                    if self._pending.get(pair) is entry:
+                        del self._pending[pair]
+                self._rewrite_spool()
+            self.last_error = None
+
+    def read_through_leaderboard(self) -> List[Dict[str, Any]]:
+        """get_leaderboard() with the current event's queued submissions applied on top of the stored totals."""
+        event_id = str(db.current_event_id())
+        # Held so a batch cannot land between reading the totals and the queue
+        with self._flush_lock:
+            with self._lock:
+                pending = {
+                    pair: dict(entry["answers"])
+                    for pair, entry in self._pending.items()
+                    if entry["event_id"] == event_id
+                }
+            return db.get_leaderboard_with_pending(pending)
+
+    # Spool file
+
+    def _append_spool(self, entry: Dict[str, Any]):
+        # Caller holds _lock
+        os.makedirs(os.path.dirname(self.spool_path) or ".", exist_ok=True)
+        with open(self.spool_path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(entry) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def _rewrite_spool(self):
+        # Caller holds _lock; atomically replace the spool with what is still pending
+        tmp_path = self.spool_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            for entry in self._pending.values():
+                fh.write(json.dumps(entry) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, self.spool_path)
+
+    def _replay_spool(self):
+        if not os.path.exists(self.spool_path):
+            return
+        with open(self.spool_path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn final line from a crash mid-append
+                # Spooled before events existed
+                entry.setdefault("event_id", str(db.default_event_id()))
+                self._pending[(entry["judge_id"], entry["competitor_id"])] = entry
+                self._next_seq = max(self._next_seq, entry["seq"] + 1)
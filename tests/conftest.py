@@ -0,0 +1,83 @@
+"""
+Shared fixtures: db.py pointed at a fresh, migrated database for each test,
+with every command it sends recorded.
+
+Tests run on the in-process engine (memory_db.py). Set TEST_MONGODB_URI to
+run them against a MongoDB instead; its `judging_test` database is wiped.
+"""
+import os
+import sys
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from pymongo import MongoClient, monitoring
+
+import db
+from memory_db import MemoryClient
+
+TEST_DB = "judging_test"
+
+
+class CommandRecorder(monitoring.CommandListener):
+    """Keeps (collection, command name, command) for every command sent."""
+
+    def __init__(self):
+        self.commands = []
+
+    def clear(self):
+        self.commands = []
+
+    def count(self, collection: str, command_name: Optional[str] = None) -> int:
+        return sum(
+            1 for coll, name, _ in self.commands if coll == collection and command_name in (None, name)
+        )
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if isinstance(collection, str):
+            self.commands.append((collection, event.command_name, event.command))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+@pytest.fixture(scope="session")
+def recorder():
+    return CommandRecorder()
+
+
+@pytest.fixture(scope="session")
+def client(recorder):
+    listeners = [db._query_listener, recorder]
+    uri = os.environ.get("TEST_MONGODB_URI")
+    client = MongoClient(uri, event_listeners=listeners) if uri else MemoryClient(event_listeners=listeners)
+    yield client
+    client.drop_database(TEST_DB)
+    client.close()
+
+
+@pytest.fixture
+def empty_database(client, recorder, monkeypatch):
+    """A wiped database that db.py uses, before any migration has run."""
+    client.drop_database(TEST_DB)
+    database = client[TEST_DB]
+    monkeypatch.setattr(db, "get_db", lambda: database)
+    # Process-wide state left behind by the previous test
+    db._default_event.pop(TEST_DB, None)
+    db._epoch_cache.clear()
+    db._settings_cache.update(generation=None, checked_at=0.0, values={})
+    db.set_current_event(None)
+    recorder.clear()
+    return database
+
+
+@pytest.fixture
+def database(empty_database, recorder):
+    db.run_migrations(empty_database)
+    recorder.clear()
+    return empty_database
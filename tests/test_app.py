@@ -0,0 +1,98 @@
+import os
+import time
+
+import pytest
+from pymongo.errors import AutoReconnect
+from streamlit.testing.v1 import AppTest
+
+import db
+import export_jobs
+from test_migrations import png_bytes
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+@pytest.fixture
+def app(database, monkeypatch):
+    # The app script imports db.py, whose get_db the database fixture points at the test database
+    monkeypatch.setenv("DATABASE_BACKEND", "memory")
+    db._ensure_schema.clear()
+    db.create_default_admin_if_missing(database)
+    admin = db.authenticate_user("admin", "admin")
+    at = AppTest.from_file(APP, default_timeout=30)
+    at.session_state["user"] = admin
+    return at
+
+
+def background_css(at):
+    return [m.value for m in at.markdown if "background-color" in m.value]
+
+
+def test_background_follows_selected_event(app):
+    db.set_background_color("#111111")
+    second = db.create_event("Second")
+    db.set_current_event(second)
+    db.set_background_color("#222222")
+    db.set_current_event(None)
+
+    app.run()
+    assert not app.exception
+    assert any("#111111" in css for css in background_css(app))
+
+    app.sidebar.selectbox[0].set_value(str(second)).run()
+    assert not app.exception
+    css = background_css(app)
+    assert any("#222222" in c for c in css) and not any("#111111" in c for c in css)
+
+
+def test_exports_load_only_the_chosen_file(app):
+    db.insert_competitor("Team A")
+    app.run()
+    app.sidebar.radio[0].set_value("Leaderboard").run()
+    app.button(key="export_leaderboard").click().run()
+    app.button(key="export_detailed").click().run()
+    manager = export_jobs.get_export_manager()
+    for job_id in app.session_state["export_jobs"]:
+        while manager.get(job_id).status == "running":
+            time.sleep(0.05)
+    app.run()
+
+    assert not app.exception
+    assert len(app.get("download_button")) == 0
+    first = app.session_state["export_jobs"][0]
+    app.button(key=f"prepare_{first}").click().run()
+    # Newest job first: the detailed export
+    assert [b.label for b in app.get("download_button")] == ["Download Detailed submissions (CSV)"]
+
+
+@pytest.mark.parametrize("page", ["Manage Judges", "Manage Competitors", "Manage Questions", "Customize", "Leaderboard"])
+def test_admin_pages_render(app, page):
+    db.set_background_color("#123456")
+    app.run()
+    app.sidebar.radio[0].set_value(page).run()
+
+    assert not app.exception
+    assert not app.error
+
+
+def test_scoring_banner_is_retried_after_a_failed_read(app, monkeypatch):
+    import views.scoring_page as scoring_page
+
+    db.insert_competitor("Team A")
+    db.insert_question("Q1")
+    db.create_judge_account("Judge", "judge@example.com", "judge", "secret")
+    db.save_banner_image(png_bytes(), "b.png", "image/png")
+    app.session_state["user"] = db.authenticate_user("judge", "secret")
+
+    def unreachable():
+        raise AutoReconnect("connection reset")
+
+    monkeypatch.setattr(scoring_page, "get_banner_for_display", unreachable)
+    app.run()
+    assert not app.exception
+    assert len(app.get("image")) == 0
+
+    monkeypatch.setattr(scoring_page, "get_banner_for_display", db.get_banner_for_display)
+    app.run()
+    assert not app.exception
+    assert len(app.get("image")) == 1
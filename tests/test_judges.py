@@ -0,0 +1,40 @@
+import pytest
+
+import db
+
+
+def add_judges(count: int):
+    for i in range(count):
+        db.create_judge_account(f"Judge {i}", f"judge{i}@example.com", f"judge{i}", "secret")
+
+
+@pytest.mark.parametrize("judges", [1, 5, 40])
+def test_get_judges_with_user_reads_users_once(database, recorder, judges):
+    add_judges(judges)
+    recorder.clear()
+
+    rows = db.get_judges_with_user()
+
+    assert [row["username"] for row in rows] == [f"judge{i}" for i in range(judges)]
+    # One bulk users lookup however many judges there are (no find_one per judge)
+    assert recorder.count("users") == 1
+    assert recorder.count("judges") == 1
+
+
+def test_judges_page_reads_users_once(database, recorder):
+    add_judges(30)
+    recorder.clear()
+
+    rows, total = db.get_judges_with_user_page(page_size=10)
+
+    assert total == 30
+    assert len(rows) == 10 and all(row["username"] for row in rows)
+    assert recorder.count("users") == 1
+
+
+def test_judge_without_login_has_no_username(database):
+    db.insert_judge("No login", "nologin@example.com")
+
+    (row,) = db.get_judges_with_user()
+
+    assert row["username"] is None
@@ -0,0 +1,198 @@
+"""
+The in-memory engine against the MongoDB behaviour db.py relies on.
+"""
+import re
+
+import pytest
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, DeleteMany, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from memory_db import MemoryClient
+
+
+@pytest.fixture
+def mdb():
+    return MemoryClient()["memory_test"]
+
+
+def names(cursor):
+    return [doc["name"] for doc in cursor]
+
+
+# Queries
+
+def test_regex_prefix_and_options(mdb):
+    mdb.people.insert_many([{"name": "Alice"}, {"name": "alfred"}, {"name": "Bob"}])
+    assert names(mdb.people.find({"name": {"$regex": "^al"}})) == ["alfred"]
+    assert names(mdb.people.find({"name": {"$regex": "^al", "$options": "i"}})) == ["Alice", "alfred"]
+    assert names(mdb.people.find({"name": re.compile("^B")})) == ["Bob"]
+
+
+def test_exists_and_dotted_paths(mdb):
+    mdb.docs.insert_many(
+        [{"name": "a", "answers": {"q1": 10}}, {"name": "b", "answers": {}}, {"name": "c"}]
+    )
+    assert names(mdb.docs.find({"answers.q1": {"$exists": True}})) == ["a"]
+    assert names(mdb.docs.find({"answers": {"$exists": False}})) == ["c"]
+    assert names(mdb.docs.find({"answers.q1": 10})) == ["a"]
+
+
+def test_null_matches_missing(mdb):
+    mdb.docs.insert_many([{"name": "a", "avg": None}, {"name": "b"}, {"name": "c", "avg": 5}])
+    assert names(mdb.docs.find({"avg": None})) == ["a", "b"]
+
+
+def test_array_fields_match_elements(mdb):
+    e1, e2 = ObjectId(), ObjectId()
+    mdb.judges.insert_many([{"name": "a", "event_ids": [e1]}, {"name": "b", "event_ids": [e1, e2]}, {"name": "c"}])
+    assert names(mdb.judges.find({"event_ids": e2})) == ["b"]
+    assert names(mdb.judges.find({"event_ids": {"$ne": e1}})) == ["c"]
+    assert names(mdb.judges.find({"event_ids": {"$size": 0}})) == []
+
+
+def test_in_or_sort_skip_limit_projection(mdb):
+    mdb.rows.insert_many([{"name": n, "score": s} for n, s in [("a", 3), ("b", 1), ("c", 2), ("d", 3)]])
+    query = {"$or": [{"score": {"$in": [1, 3]}}, {"name": "c"}]}
+    cursor = mdb.rows.find(query, {"name": 1, "_id": 0}).sort([("score", DESCENDING), ("name", ASCENDING)])
+    assert list(cursor.skip(1).limit(2)) == [{"name": "d"}, {"name": "c"}]
+    assert mdb.rows.count_documents({"score": {"$gte": 2}}) == 3
+    assert sorted(mdb.rows.distinct("score")) == [1, 2, 3]
+
+
+# Updates
+
+def test_add_to_set_and_pull(mdb):
+    e1, e2 = ObjectId(), ObjectId()
+    mdb.judges.insert_one({"_id": 1, "event_ids": [e1]})
+    mdb.judges.update_one({"_id": 1}, {"$addToSet": {"event_ids": e2}})
+    mdb.judges.update_one({"_id": 1}, {"$addToSet": {"event_ids": e2}})
+    assert mdb.judges.find_one({"_id": 1})["event_ids"] == [e1, e2]
+    mdb.judges.update_one({"_id": 1}, {"$pull": {"event_ids": e1}})
+    assert mdb.judges.find_one({"_id": 1})["event_ids"] == [e2]
+
+
+def test_operator_update_and_upsert(mdb):
+    mdb.counters.update_one({"_id": "c"}, {"$inc": {"value": 1}, "$setOnInsert": {"created": True}}, upsert=True)
+    mdb.counters.update_one({"_id": "c"}, {"$inc": {"value": 1}, "$setOnInsert": {"created": False}}, upsert=True)
+    mdb.counters.update_one({"_id": "c"}, {"$unset": {"created": ""}, "$set": {"nested.x": 1}})
+    assert mdb.counters.find_one({"_id": "c"}) == {"_id": "c", "value": 2, "nested": {"x": 1}}
+
+
+def test_upsert_seeds_equality_fields(mdb):
+    mdb.pairs.update_one({"judge_id": 1, "competitor_id": 2}, {"$set": {"avg": 5}}, upsert=True)
+    doc = mdb.pairs.find_one({}, {"_id": 0})
+    assert doc == {"judge_id": 1, "competitor_id": 2, "avg": 5}
+
+
+def test_pipeline_update(mdb):
+    mdb.subs.insert_one({"_id": 1, "answers": {"q1": 20, "q2": 40, "q3": 90}, "version": 1})
+    mdb.subs.update_many(
+        {"answers.q3": {"$exists": True}},
+        [
+            {"$unset": "answers.q3"},
+            {
+                "$set": {
+                    "avg": {"$avg": {"$map": {"input": {"$objectToArray": "$answers"}, "as": "a", "in": "$$a.v"}}},
+                    "version": {"$add": ["$version", 1]},
+                    "name_lc": {"$toLower": "ABC"},
+                }
+            },
+        ],
+    )
+    assert mdb.subs.find_one({"_id": 1}) == {
+        "_id": 1, "answers": {"q1": 20, "q2": 40}, "version": 2, "avg": 30, "name_lc": "abc"
+    }
+
+
+def test_find_one_and_update_returns_before_or_after(mdb):
+    before = mdb.meta.find_one_and_update({"_id": "g"}, {"$inc": {"value": 1}}, upsert=True)
+    after = mdb.meta.find_one_and_update(
+        {"_id": "g"}, {"$inc": {"value": 1}}, projection={"value": 1}, return_document=ReturnDocument.AFTER
+    )
+    assert before is None
+    assert after == {"_id": "g", "value": 2}
+    assert mdb.meta.find_one_and_delete({"_id": "g"}, projection={"value": 1, "_id": 0}) == {"value": 2}
+    assert mdb.meta.count_documents({}) == 0
+
+
+def test_bulk_write_mixes_upserts_and_deletes(mdb):
+    mdb.subs.insert_many([{"k": 1, "v": 1}, {"k": 2, "v": 2}])
+    result = mdb.subs.bulk_write(
+        [UpdateOne({"k": 1}, {"$set": {"v": 10}}, upsert=True), UpdateOne({"k": 3}, {"$set": {"v": 3}}, upsert=True),
+         DeleteMany({"k": 2})],
+        ordered=False,
+    )
+    assert (result.modified_count, result.upserted_count, result.deleted_count) == (1, 1, 1)
+    assert sorted((d["k"], d["v"]) for d in mdb.subs.find()) == [(1, 10), (3, 3)]
+
+
+# Indexes
+
+def test_unique_index_rejects_duplicates(mdb):
+    mdb.users.create_index("username", unique=True)
+    mdb.users.insert_one({"username": "ann"})
+    with pytest.raises(DuplicateKeyError):
+        mdb.users.insert_one({"username": "ann"})
+    mdb.users.insert_one({"username": "bob"})
+    with pytest.raises(DuplicateKeyError):
+        mdb.users.update_one({"username": "bob"}, {"$set": {"username": "ann"}})
+
+
+def test_unique_compound_index_in_bulk_write(mdb):
+    mdb.subs.create_index([("j", ASCENDING), ("c", ASCENDING)], unique=True)
+    mdb.subs.insert_one({"j": 1, "c": 1})
+    with pytest.raises(BulkWriteError) as info:
+        mdb.subs.bulk_write([UpdateOne({"j": 2}, {"$set": {"c": 2}}, upsert=True),
+                             UpdateOne({"j": 3}, {"$set": {"j": 1, "c": 1}}, upsert=True)], ordered=False)
+    assert [e["index"] for e in info.value.details["writeErrors"]] == [1]
+    assert mdb.subs.count_documents({}) == 2
+
+
+def test_sparse_unique_index_allows_missing(mdb):
+    mdb.users.create_index("judge_id", unique=True, sparse=True)
+    mdb.users.insert_many([{"username": "admin"}, {"username": "root"}, {"judge_id": 1}])
+    with pytest.raises(DuplicateKeyError):
+        mdb.users.insert_one({"judge_id": 1})
+    assert mdb.users.count_documents({"judge_id": None}) == 2
+
+
+def test_multikey_index_serves_element_lookups(mdb):
+    e1, e2 = ObjectId(), ObjectId()
+    mdb.judges.create_index([("event_ids", ASCENDING), ("_id", ASCENDING)])
+    mdb.judges.insert_many([{"name": "a", "event_ids": [e1, e2]}, {"name": "b", "event_ids": [e2]}])
+    mdb.judges.update_one({"name": "a"}, {"$pull": {"event_ids": e2}})
+    assert names(mdb.judges.find({"event_ids": e2})) == ["b"]
+    assert names(mdb.judges.find({"event_ids": e1})) == ["a"]
+    plan = mdb.judges.find({"event_ids": e1}).explain()["queryPlanner"]["winningPlan"]
+    assert plan["inputStage"]["stage"] == "IXSCAN"
+    assert plan["inputStage"]["indexBounds"]["_id"] == ["[MinKey, MaxKey]"]
+
+
+# Aggregation
+
+def test_group_and_merge(mdb):
+    mdb.answers.insert_many(
+        [{"j": 1, "c": 1, "q": "a", "v": 20}, {"j": 1, "c": 1, "q": "b", "v": 40}, {"j": 2, "c": 1, "q": "a", "v": 90}]
+    )
+    mdb.subs.insert_one({"j": 1, "c": 1, "note": "kept"})
+    mdb.answers.aggregate(
+        [
+            {"$group": {"_id": {"j": "$j", "c": "$c"}, "answers": {"$push": {"k": "$q", "v": "$v"}}, "avg": {"$avg": "$v"}}},
+            {"$project": {"_id": 0, "j": "$_id.j", "c": "$_id.c", "answers": {"$arrayToObject": "$answers"}, "avg": 1}},
+            {"$merge": {"into": "subs", "on": ["j", "c"], "whenMatched": "merge", "whenNotMatched": "insert"}},
+        ]
+    )
+    docs = {d["j"]: d for d in mdb.subs.find({}, {"_id": 0})}
+    assert docs[1] == {"j": 1, "c": 1, "note": "kept", "answers": {"a": 20, "b": 40}, "avg": 30}
+    assert docs[2] == {"j": 2, "c": 1, "answers": {"a": 90}, "avg": 90}
+
+
+def test_group_sum_count_and_match(mdb):
+    mdb.subs.insert_many([{"e": 1, "c": "x", "avg": 10}, {"e": 1, "c": "x", "avg": 30}, {"e": 2, "c": "x", "avg": 99}])
+    rows = list(
+        mdb.subs.aggregate(
+            [{"$match": {"e": 1}}, {"$group": {"_id": "$c", "total": {"$sum": "$avg"}, "n": {"$sum": 1}}}]
+        )
+    )
+    assert rows == [{"_id": "x", "total": 40, "n": 2}]
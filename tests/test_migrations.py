@@ -0,0 +1,55 @@
+import io
+
+from PIL import Image
+
+import db
+
+
+def png_bytes(width=2000, height=400) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 40, 40)).save(out, format="PNG")
+    return out.getvalue()
+
+
+def test_fresh_database_applies_every_migration(empty_database):
+    applied = db.run_migrations(empty_database)
+
+    assert applied == [version for version, _, _ in db.MIGRATIONS]
+    assert db.run_migrations(empty_database) == []
+
+
+def test_legacy_banner_is_kept_through_upgrade(empty_database):
+    data = png_bytes()
+    empty_database.assets.insert_one({"key": "banner", "filename": "b.png", "content_type": "image/png", "data": data})
+
+    db.run_migrations(empty_database)
+
+    banners = list(empty_database.assets.find({"key": "banner"}))
+    assert len(banners) == 1
+    assert banners[0]["event_id"] == db.current_event_id() and banners[0]["hash"]
+    assert db.get_banner_image()["data"] == data
+    shown = db.get_banner_for_display()
+    assert Image.open(io.BytesIO(shown)).format == "WEBP"
+
+
+def test_legacy_scores_become_default_event_submissions(empty_database):
+    comp = empty_database.competitors.insert_one({"name": "Old", "notes": ""}).inserted_id
+    q1 = empty_database.questions.insert_one({"prompt": "Q1"}).inserted_id
+    q2 = empty_database.questions.insert_one({"prompt": "Q2"}).inserted_id
+    judge = empty_database.judges.insert_one({"name": "J", "email": "j@example.com"}).inserted_id
+    empty_database.answers.insert_many(
+        [
+            {"judge_id": judge, "competitor_id": comp, "question_id": q1, "value": 40},
+            {"judge_id": judge, "competitor_id": comp, "question_id": q2, "value": 80},
+        ]
+    )
+    empty_database.scores.insert_one({"judge_id": judge, "competitor_id": comp, "value": 60})
+
+    db.run_migrations(empty_database)
+
+    assert db.get_answers_for_judge(judge) == {str(comp): {str(q1): 40, str(q2): 80}}
+    (submission,) = empty_database.submissions.find()
+    assert sorted(submission["question_ids"]) == sorted([q1, q2])
+    (row,) = db.get_leaderboard()
+    assert (row["competitor_name"], row["avg_score"], row["num_scores"]) == ("Old", 60, 1)
+    assert "answers" not in empty_database.list_collection_names()
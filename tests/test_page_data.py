@@ -0,0 +1,38 @@
+import threading
+import time
+
+import pytest
+
+import db
+from page_data import PageLoadTimeout, load_page_data
+
+
+def test_reads_run_concurrently_in_the_callers_event(database):
+    event_id = db.create_event("Second")
+    db.set_current_event(event_id)
+    barrier = threading.Barrier(2, timeout=5)
+
+    def read(name):
+        def run():
+            barrier.wait()  # both reads must be running at once to get past this
+            return name, db.current_event_id()
+        return run
+
+    data = load_page_data({"a": read("a"), "b": read("b")})
+
+    assert data == {"a": ("a", event_id), "b": ("b", event_id)}
+    assert set(data.timings) == {"a", "b"}
+
+
+def test_slow_read_raises_page_load_timeout(database):
+    with pytest.raises(PageLoadTimeout) as info:
+        load_page_data({"fast": lambda: 1, "slow": lambda: time.sleep(0.5)}, timeout=0.1)
+    assert info.value.pending == ["slow"]
+
+
+def test_read_errors_propagate(database):
+    def broken():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        load_page_data({"broken": broken})
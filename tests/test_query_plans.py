@@ -0,0 +1,254 @@
+"""
+Every query db.py sends must be served by an index.
+
+Each public function is called on a small seeded event, the filters it sends
+are captured through the command listener and explained. A function fails if
+any of its queries is a collection scan, or bounds the index on the event
+alone while matching other fields exactly (it then reads the whole event).
+
+Only MongoDB's own plans count, so the plan checks run with TEST_MONGODB_URI
+set (a local mongod will do) and are skipped on the in-process engine.
+"""
+import inspect
+import io
+import os
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import pytest
+from PIL import Image
+
+import db
+
+needs_mongodb = pytest.mark.skipif(
+    not os.environ.get("TEST_MONGODB_URI"), reason="query plans need a MongoDB (set TEST_MONGODB_URI)"
+)
+
+# Functions that send no queries of their own, or only run once on upgrade
+NOT_QUERIES = {
+    "is_db_configured", "start_query_profile", "stop_query_profile", "get_query_profile", "set_query_profile",
+    "bind_causal_token", "causal_token", "workload", "set_current_event", "current_event_id", "migration",
+    "init_db", "run_migrations", "rank_leaderboard", "hash_password", "iter_csv_rows",
+}
+
+# (function, collection) whose scans are accepted, with why
+ALLOWED_SCANS = {
+    ("get_judges_outside_event", "judges"): "$ne on event_ids matches nearly every judge; no index narrows it",
+}
+
+EVENT_FIELDS = {"event_id", "event_ids"}
+UNBOUNDED = ["[MinKey, MaxKey]"]
+
+
+def png_bytes() -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (1600, 300), (40, 40, 200)).save(out, format="PNG")
+    return out.getvalue()
+
+
+def csv_upload(text: str) -> io.BytesIO:
+    return io.BytesIO(text.encode())
+
+
+def reread_settings():
+    db._settings_cache.update(generation=None, checked_at=0.0, values={})
+
+
+def import_all(s):
+    db.import_csv("competitors", csv_upload("name,notes\nImported,\n"))
+    db.import_csv("questions", csv_upload("prompt\nImported?\n"))
+    db.import_csv("judges", csv_upload("name,email,username,password\nImp,imp@example.com,imp,pw\n"))
+
+
+def fresh_default_event(s):
+    db._default_event.pop(db.get_db().name, None)
+    db.default_event_id()
+
+
+CALLS = {
+    "get_events": lambda s: (db.get_events(), db.get_events(include_archived=True)),
+    "get_event": lambda s: db.get_event(s["other_event"]),
+    "get_events_for_judge": lambda s: db.get_events_for_judge(s["judges"][0]),
+    "create_event": lambda s: db.create_event("Third"),
+    "archive_event": lambda s: db.archive_event(s["other_event"]),
+    "unarchive_event": lambda s: db.unarchive_event(s["other_event"]),
+    "default_event_id": fresh_default_event,
+    "get_applied_migrations": lambda s: db.get_applied_migrations(db.get_db()),
+    "get_judges": lambda s: db.get_judges(),
+    "get_judges_with_user": lambda s: db.get_judges_with_user(),
+    "get_judges_with_user_page": lambda s: (db.get_judges_with_user_page(), db.get_judges_with_user_page("jud")),
+    "get_judges_outside_event": lambda s: db.get_judges_outside_event(),
+    "add_judges_to_event": lambda s: db.add_judges_to_event([s["other_judge"]]),
+    "insert_judge": lambda s: db.insert_judge("New", "new@example.com"),
+    "create_judge_account": lambda s: db.create_judge_account("New", "new@example.com", "new", "pw"),
+    "get_judge_by_id": lambda s: db.get_judge_by_id(s["judges"][0]),
+    "update_judge_account": lambda s: db.update_judge_account(s["judges"][0], "Renamed", "r@example.com", "r", "pw"),
+    "delete_judge_account": lambda s: db.delete_judge_account(s["judges"][0]),
+    "get_competitors": lambda s: db.get_competitors(),
+    "get_competitors_page": lambda s: (db.get_competitors_page(), db.get_competitors_page("team")),
+    "insert_competitor": lambda s: db.insert_competitor("Team C"),
+    "update_competitor": lambda s: db.update_competitor(s["competitors"][0], "Team Z", "notes"),
+    "delete_competitor": lambda s: db.delete_competitor(s["competitors"][0]),
+    "replace_scores_for_judge": lambda s: db.replace_scores_for_judge(s["judges"][0], {s["competitors"][1]: 50}),
+    "save_answers_for_judge": lambda s: db.save_answers_for_judge(
+        s["judges"][1], s["competitors"][1], {s["questions"][0]: 70}, cache={}
+    ),
+    "save_answers_batch": lambda s: db.save_answers_batch(
+        {(db.current_event_id(), s["judges"][1], s["competitors"][1]): {s["questions"][1]: 20}}
+    ),
+    "get_scores_for_judge": lambda s: db.get_scores_for_judge(s["judges"][0]),
+    "get_leaderboard": lambda s: db.get_leaderboard(),
+    "get_leaderboard_with_pending": lambda s: db.get_leaderboard_with_pending(
+        {(s["judges"][0], s["competitors"][0]): {s["questions"][0]: 10}}
+    ),
+    "get_ranked_leaderboard": lambda s: db.get_ranked_leaderboard(),
+    "get_score_epoch": lambda s: db.get_score_epoch(),
+    "cached_for_epoch": lambda s: db.cached_for_epoch("plans", list),
+    "rebuild_leaderboard": lambda s: db.rebuild_leaderboard(),
+    "get_settings_generation": lambda s: db.get_settings_generation(),
+    "save_banner_image": lambda s: db.save_banner_image(s["banner"], "b.png", "image/png"),
+    "get_banner_image": lambda s: (reread_settings(), db.get_banner_image()),
+    "get_banner_for_display": lambda s: (reread_settings(), db.get_banner_for_display()),
+    "delete_banner_image": lambda s: db.delete_banner_image(),
+    "set_background_color": lambda s: db.set_background_color("#123456"),
+    "get_background_color": lambda s: (reread_settings(), db.get_background_color()),
+    "clear_background_color": lambda s: db.clear_background_color(),
+    "set_intro_message": lambda s: db.set_intro_message("Hello"),
+    "get_intro_message": lambda s: (reread_settings(), db.get_intro_message()),
+    "clear_intro_message": lambda s: db.clear_intro_message(),
+    "get_questions": lambda s: db.get_questions(),
+    "get_questions_page": lambda s: db.get_questions_page(),
+    "insert_question": lambda s: db.insert_question("Q3"),
+    "update_question": lambda s: db.update_question(s["questions"][0], "Q1?"),
+    "delete_question": lambda s: db.delete_question(s["questions"][0]),
+    "get_answers_for_judge_competitor": lambda s: db.get_answers_for_judge_competitor(
+        s["judges"][0], s["competitors"][0]
+    ),
+    "get_answers_for_judge": lambda s: db.get_answers_for_judge(s["judges"][0]),
+    "get_judge_answers": lambda s: db.get_judge_answers(db.get_judge_by_id(s["judges"][0]), {}),
+    "import_csv": import_all,
+    "count_detailed_submissions": lambda s: db.count_detailed_submissions(),
+    "iter_detailed_submissions": lambda s: list(db.iter_detailed_submissions()),
+    "create_default_admin_if_missing": lambda s: db.create_default_admin_if_missing(db.get_db()),
+    "authenticate_user": lambda s: db.authenticate_user("j1", "secret"),
+}
+
+
+@pytest.fixture
+def seeded(database):
+    other_event = db.create_event("Other")
+    db.set_current_event(other_event)
+    other_judge = db.create_judge_account("Other judge", "o@example.com", "other", "secret")
+    db.set_current_event(None)
+    for name in ("Team A", "Team B"):
+        db.insert_competitor(name)
+    for prompt in ("Q1", "Q2"):
+        db.insert_question(prompt)
+    db.create_judge_account("Judge 1", "j1@example.com", "j1", "secret")
+    db.create_judge_account("Judge 2", "j2@example.com", "j2", "secret")
+    seeded = {
+        "other_event": other_event,
+        "other_judge": other_judge,
+        "judges": [j.id for j in db.get_judges()],
+        "competitors": [c.id for c in db.get_competitors()],
+        "questions": [q.id for q in db.get_questions()],
+        "banner": png_bytes(),
+    }
+    (j1, j2), (a, _), (q1, q2) = seeded["judges"], seeded["competitors"], seeded["questions"]
+    db.save_answers_for_judge(j1, a, {q1: 40, q2: 80})
+    db.save_answers_for_judge(j2, a, {q1: 60})
+    db.save_banner_image(seeded["banner"], "b.png", "image/png")
+    db.set_background_color("#654321")
+    db.set_intro_message("Welcome")
+    return seeded
+
+
+def sent_queries(commands) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """(collection, filter) for each query in the recorded commands."""
+    for collection, name, command in commands:
+        if name == "find":
+            yield collection, command.get("filter") or {}
+        elif name in ("count", "distinct", "findAndModify"):
+            yield collection, command.get("query") or {}
+        elif name in ("update", "delete"):
+            # The memory engine records one q; MongoDB sends a list of statements
+            statements = command.get("updates") or command.get("deletes") or [command]
+            for statement in statements:
+                yield collection, statement.get("q") or {}
+        elif name == "aggregate":
+            pipeline = command.get("pipeline") or [{}]
+            yield collection, pipeline[0].get("$match", {})
+        elif name == "bulkWrite":
+            for statement in command.get("ops") or []:
+                if "q" in statement:
+                    yield collection, statement["q"] or {}
+
+
+def plan_stages(plan) -> Iterator[dict]:
+    """Every stage of an explain plan, however it is nested."""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan
+        children = list(plan.values())
+    elif isinstance(plan, list):
+        children = plan
+    else:
+        return
+    for child in children:
+        yield from plan_stages(child)
+
+
+def equality_fields(query: Dict[str, Any]) -> set:
+    """Fields an index could bound to exact keys: equality, $in and $exists."""
+    fields = set()
+    for field, condition in query.items():
+        if field.startswith("$"):
+            continue
+        if not isinstance(condition, dict) or set(condition) <= {"$eq", "$in", "$exists"}:
+            fields.add(field)
+    return fields
+
+
+def plan_problem(database, collection: str, query: Dict[str, Any]) -> Optional[str]:
+    if not query:
+        # Reads the whole collection on purpose
+        return None
+    plan = database[collection].find(query).explain()["queryPlanner"]["winningPlan"]
+    stages = list(plan_stages(plan))
+    if any(stage["stage"] == "COLLSCAN" for stage in stages):
+        return "COLLSCAN"
+    scan = next((stage for stage in stages if stage["stage"] in ("IXSCAN", "EXPRESS_IXSCAN")), None)
+    if scan is None:
+        # IDHACK or EXPRESS_IDHACK: a point read by _id
+        return None
+    if "$or" in query and set(query) == {"$or"}:
+        # Each branch got its own index scan
+        return None
+    bounded = {field for field, bounds in scan.get("indexBounds", {}).items() if bounds != UNBOUNDED}
+    if bounded and bounded <= EVENT_FIELDS and equality_fields(query) - EVENT_FIELDS:
+        return f"only {sorted(bounded)} bounded in {scan['indexName']}"
+    return None
+
+
+def test_every_public_function_is_checked():
+    public = {
+        name for name, fn in vars(db).items()
+        if inspect.isfunction(fn) and fn.__module__ == db.__name__ and not name.startswith("_")
+    }
+    assert public - NOT_QUERIES == set(CALLS)
+
+
+@needs_mongodb
+@pytest.mark.parametrize("name", sorted(CALLS))
+def test_queries_use_an_index(seeded, recorder, name):
+    recorder.clear()
+    CALLS[name](seeded)
+    commands = list(recorder.commands)
+    problems = []
+    for collection, query in sent_queries(commands):
+        if (name, collection) in ALLOWED_SCANS:
+            continue
+        problem = plan_problem(db.get_db(), collection, query)
+        if problem:
+            problems.append(f"{collection} {query}: {problem}")
+
+    assert not problems
@@ -0,0 +1,132 @@
+import pytest
+
+import db
+
+
+@pytest.fixture
+def event(database):
+    """Two judges, two competitors and two questions in the default event."""
+    db.insert_competitor("Team A")
+    db.insert_competitor("Team B")
+    db.insert_question("Q1")
+    db.insert_question("Q2")
+    db.create_judge_account("Judge 1", "j1@example.com", "j1", "secret")
+    db.create_judge_account("Judge 2", "j2@example.com", "j2", "secret")
+    return {
+        "judges": [j.id for j in db.get_judges()],
+        "competitors": [c.id for c in db.get_competitors()],
+        "questions": [q.id for q in db.get_questions()],
+    }
+
+
+def totals():
+    return {row["competitor_name"]: (row["total_score"], row["num_scores"]) for row in db.get_leaderboard()}
+
+
+def test_save_answers_keeps_leaderboard_current(event):
+    (j1, j2), (a, b), (q1, q2) = event["judges"], event["competitors"], event["questions"]
+    db.save_answers_for_judge(j1, a, {q1: 40, q2: 80})
+    db.save_answers_for_judge(j2, a, {q1: 100})
+    db.save_answers_for_judge(j1, a, {q1: 20})
+    db.save_answers_for_judge(j2, b, {q2: 50})
+    db.save_answers_for_judge(j2, b, {})
+
+    assert totals() == {"Team A": (120, 2), "Team B": (0, 0)}
+    assert db.get_answers_for_judge_competitor(j1, a) == {q1: 20}
+
+
+def test_save_answers_batch_matches_single_saves(event):
+    (j1, j2), (a, b), (q1, q2) = event["judges"], event["competitors"], event["questions"]
+    db.save_answers_for_judge(j1, a, {q1: 10})
+    event_id = db.current_event_id()
+
+    db.save_answers_batch(
+        {(event_id, j1, a): {q1: 30, q2: 50}, (event_id, j2, a): {q1: 60}, (event_id, j1, b): {}}
+    )
+
+    assert totals() == {"Team A": (100, 2), "Team B": (0, 0)}
+    db.rebuild_leaderboard()
+    assert totals() == {"Team A": (100, 2), "Team B": (0, 0)}
+
+
+def test_leaderboard_with_pending_applies_unsaved_submissions(event):
+    (j1, j2), (a, b), (q1, _) = event["judges"], event["competitors"], event["questions"]
+    db.save_answers_for_judge(j1, a, {q1: 40})
+
+    rows = db.get_leaderboard_with_pending({(j1, a): {q1: 80}, (j2, b): {q1: 60}})
+
+    assert [(r["competitor_name"], r["avg_score"], r["num_scores"]) for r in rows] == [
+        ("Team A", 80, 1),
+        ("Team B", 60, 1),
+    ]
+    # Nothing was written
+    assert totals() == {"Team A": (40, 1), "Team B": (0, 0)}
+
+
+def test_delete_question_reaverages_and_drops_emptied_pairs(event):
+    (j1, j2), (a, b), (q1, q2) = event["judges"], event["competitors"], event["questions"]
+    db.save_answers_for_judge(j1, a, {q1: 40, q2: 80})
+    db.save_answers_for_judge(j2, a, {q2: 100})
+    db.save_answers_for_judge(j2, b, {q1: 30})
+
+    db.delete_question(q2)
+
+    assert totals() == {"Team A": (40, 1), "Team B": (30, 1)}
+    assert db.get_answers_for_judge(j1) == {a: {q1: 40}}
+    assert db.get_answers_for_judge(j2) == {b: {q1: 30}}
+    db.rebuild_leaderboard()
+    assert totals() == {"Team A": (40, 1), "Team B": (30, 1)}
+
+
+def test_delete_question_round_trips_do_not_grow_with_pairs(event, recorder):
+    (j1, j2), (a, b), (q1, q2) = event["judges"], event["competitors"], event["questions"]
+    db.save_answers_for_judge(j1, a, {q1: 40, q2: 80})
+    recorder.clear()
+    db.delete_question(q2)
+    one_pair = len(recorder.commands)
+
+    db.insert_question("Q3")
+    q3 = db.get_questions()[-1].id
+    for judge in (j1, j2):
+        for comp in (a, b):
+            db.save_answers_for_judge(judge, comp, {q1: 10, q3: 30})
+    recorder.clear()
+    db.delete_question(q3)
+
+    assert len(recorder.commands) == one_pair
+    assert totals() == {"Team A": (20, 2), "Team B": (20, 2)}
+
+
+def test_replaced_score_survives_question_delete(event):
+    (j1, _), (a, _), (q1, q2) = event["judges"], event["competitors"], event["questions"]
+    db.save_answers_for_judge(j1, a, {q1: 40, q2: 80})
+    cache = {}
+    db.get_judge_answers(db.get_judge_by_id(j1, db.JudgeVersion), cache)
+
+    db.replace_scores_for_judge(j1, {a: 50})
+    db.delete_question(q2)
+
+    assert totals()["Team A"] == (50, 1)
+    assert db.get_judge_answers(db.get_judge_by_id(j1, db.JudgeVersion), cache) == {}
+
+
+def test_delete_judge_with_a_save_racing_the_delete(event, monkeypatch):
+    (j1, j2), (a, b), (q1, _) = event["judges"], event["competitors"], event["questions"]
+    db.save_answers_for_judge(j1, a, {q1: 40})
+    db.save_answers_for_judge(j2, a, {q1: 80})
+    submissions = type(db.get_db().submissions)
+    delete_many = submissions.delete_many
+
+    def racing_delete_many(self, *args, **kwargs):
+        # The judge saves again after their scores were read, before they are deleted
+        monkeypatch.setattr(submissions, "delete_many", delete_many)
+        db.save_answers_for_judge(j1, b, {q1: 70})
+        return delete_many(self, *args, **kwargs)
+
+    monkeypatch.setattr(submissions, "delete_many", racing_delete_many)
+    db.delete_judge_account(j1)
+
+    assert totals()["Team A"] == (80, 1)
+    kept = totals()
+    db.rebuild_leaderboard()
+    assert totals() == kept
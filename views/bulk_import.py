@@ -0,0 +1,36 @@
+import streamlit as st
+
+from db import IMPORT_COLUMNS, import_csv
+
+
+def render_import(kind: str):
+    """CSV upload that bulk-inserts `kind` rows and reports rejected lines."""
+    required, optional = IMPORT_COLUMNS[kind]
+    with st.expander(f"Import {kind} from CSV"):
+        columns = ", ".join(required) + (f" (optional: {', '.join(optional)})" if optional else "")
+        st.caption(f"Columns: {columns}")
+        with st.form(f"import_{kind}", clear_on_submit=True):
+            upload = st.file_uploader("CSV file", type=["csv"])
+            submitted = st.form_submit_button("Import")
+        if submitted:
+            if upload is None:
+                st.error("Choose a CSV file first.")
+                return
+            upload.seek(0)
+            try:
+                report = import_csv(kind, upload)
+            except (ValueError, UnicodeDecodeError) as exc:
+                st.error(f"Could not read CSV: {exc}")
+                return
+            st.session_state[f"import_{kind}_report"] = report
+            st.rerun()
+
+        report = st.session_state.pop(f"import_{kind}_report", None)
+        if report:
+            st.success(f"Imported {report['inserted']} {kind}.")
+            if report["errors"]:
+                st.warning(f"{len(report['errors'])} row(s) skipped.")
+                st.dataframe(
+                    [{"Line": line, "Problem": message} for line, message in report["errors"]],
+                    hide_index=True,
+                )
@@ -1,5 +1,7 @@
 import streamlit as st
-from db import get_competitors, insert_competitor, update_competitor, delete_competitor
+from db import ADMIN_PAGE_SIZE, get_competitors_page, insert_competitor, update_competitor, delete_competitor
+from views.bulk_import import render_import
+from views.pagination import pager, search_box
 
 def show():
     # Init add form state and pending clear
@@ -33,13 +35,19 @@ def show():
                 st.session_state["clear_new_competitor"] = True
                 st.rerun()
 
+    render_import("competitors")
+
     st.subheader("Current competitors")
 
-    # Load and display competitor list with edit/delete
-    competitors = get_competitors()
-    if not competitors:
-        st.info("No competitors yet.")
+    # Load and display one page of the competitor list with edit/delete
+    search = search_box("competitors", "Search by name")
+    page = st.session_state.get("competitors_page", 1) - 1
+    competitors, total = get_competitors_page(search, page, ADMIN_PAGE_SIZE)
+    if not total:
+        st.info("No matching competitors." if search.strip() else "No competitors yet.")
         return
+    if pager("competitors", total, ADMIN_PAGE_SIZE) != page:
+        st.rerun()
 
     for comp in competitors:
         with st.expander(comp["name"]):
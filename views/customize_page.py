@@ -7,6 +7,7 @@ from db import (
     get_background_color,
     clear_background_color,
 )
+from page_data import load_page_data
 
 
 def show():
@@ -19,7 +20,8 @@ def show():
 
     st.write("Upload a banner image that will be shown to judges on the scoring page. Size limit 1MB.")
 
-    existing = get_banner_image()
+    loaded = load_page_data({"banner": get_banner_image, "color": get_background_color})
+    existing = loaded["banner"]
     if existing and existing.get("data"):
         st.subheader("Current banner")
         st.image(existing["data"], width="stretch")
@@ -53,7 +55,7 @@ def show():
 
     st.write("---")
     st.subheader("Background colour")
-    current_color = get_background_color() or "#FFFFFF"
+    current_color = loaded["color"] or "#FFFFFF"
     col_picker, col_actions = st.columns([1, 1])
     with col_picker:
         picked = st.color_picker("Pick a background colour", value=current_color, key="bg_color_picker")
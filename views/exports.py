@@ -0,0 +1,60 @@
+import streamlit as st
+
+from export_jobs import EXPORTS, FORMATS, get_export_manager
+
+POLL_SECONDS = 1.0
+
+
+def render_exports():
+    """Start background exports and list this session's jobs with progress and downloads."""
+    st.subheader("Exports")
+    fmt = st.selectbox("Format", list(FORMATS), format_func=lambda key: FORMATS[key][0], key="export_format")
+    manager = get_export_manager()
+    job_ids = st.session_state.setdefault("export_jobs", [])
+    for col, (kind, (label, _)) in zip(st.columns(len(EXPORTS)), EXPORTS.items()):
+        if col.button(f"Export {label.lower()}", key=f"export_{kind}"):
+            job_ids.insert(0, manager.start(kind, fmt).id)
+
+    # Jobs that expired and were purged drop out of the list
+    st.session_state["export_jobs"] = job_ids = [j for j in job_ids if manager.get(j)]
+    if not job_ids:
+        return
+    running = any(manager.get(j).status == "running" for j in job_ids)
+    # Poll only while something is running; the fragment reruns alone, not the page
+    st.fragment(run_every=POLL_SECONDS if running else None)(render_jobs)(job_ids)
+
+
+def render_jobs(job_ids):
+    manager = get_export_manager()
+    jobs = [job for job in map(manager.get, job_ids) if job]
+    for job in jobs:
+        label = f"{EXPORTS[job.kind][0]} ({FORMATS[job.fmt][0]})"
+        if job.status == "running":
+            done = f"{job.rows_written} of {job.total} rows" if job.total is not None else "starting"
+            st.progress(job.progress, text=f"{label}: {done}")
+        elif job.status == "failed":
+            st.error(f"{label} failed: {job.error}")
+        elif st.session_state.get("export_download") == job.id or st.button(
+            f"Get {label}", key=f"prepare_{job.id}"
+        ):
+            # download_button holds the whole file in memory for as long as it is
+            # rendered, so only the job the admin picked gets one, until it is used
+            st.session_state["export_download"] = job.id
+            with open(job.path, "rb") as fh:
+                st.download_button(
+                    label=f"Download {label}",
+                    data=fh,
+                    file_name=job.filename,
+                    mime=FORMATS[job.fmt][1],
+                    key=f"download_{job.id}",
+                    on_click=forget_download,
+                )
+    if any(job.status == "running" for job in jobs):
+        st.session_state["export_polling"] = True
+    elif st.session_state.pop("export_polling", False):
+        # The last job finished; a full rerun registers the fragment without polling
+        st.rerun()
+
+
+def forget_download():
+    st.session_state.pop("export_download", None)
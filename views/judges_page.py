@@ -1,11 +1,17 @@
 import streamlit as st
 from db import (
-    get_judges_with_user,
+    ADMIN_PAGE_SIZE,
+    get_judges_with_user_page,
     create_judge_account,
     update_judge_account,
     delete_judge_account,
+    get_judges_outside_event,
+    add_judges_to_event,
 )
 from pymongo.errors import DuplicateKeyError
+from page_data import load_page_data
+from views.bulk_import import render_import
+from views.pagination import pager, search_box
 
 def show():
     user = st.session_state.get("user")
@@ -51,13 +57,27 @@ def show():
                     message = "Email or username already exists."
                     st.error(message)
 
+    render_import("judges")
+    # Filled once the reads below return; it sits above the list
+    existing_slot = st.container()
+
     st.subheader("Current judges")
 
-    # Load and display judge list with edit/delete controls
-    judges = get_judges_with_user()
-    if not judges:
-        st.info("No judges yet.")
+    # Load one page of the judge list (edit/delete controls below) together with judges of other events
+    search = search_box("judges", "Search by name or email")
+    page = st.session_state.get("judges_page", 1) - 1
+    data = load_page_data({
+        "judges": lambda: get_judges_with_user_page(search, page, ADMIN_PAGE_SIZE),
+        "others": get_judges_outside_event,
+    })
+    with existing_slot:
+        render_add_existing(data["others"])
+    judges, total = data["judges"]
+    if not total:
+        st.info("No matching judges." if search.strip() else "No judges yet.")
         return
+    if pager("judges", total, ADMIN_PAGE_SIZE) != page:
+        st.rerun()
 
     for judge in judges:
         with st.expander(f"{judge['name']} ({judge['email']})"):
@@ -88,9 +108,23 @@ def show():
 
             # Inline delete form
             with st.form(f"delete_judge_{judge['id']}"):
-                st.write("Delete this judge account and all their scores?")
+                st.write("Remove this judge and their scores from the event? "
+                         "The account is deleted once they belong to no event.")
                 delete_pressed = st.form_submit_button("Delete judge")
                 if delete_pressed:
                     delete_judge_account(judge["id"])
-                    st.success("Judge deleted.")
+                    st.success("Judge removed.")
                     st.rerun()
+
+
+def render_add_existing(others):
+    # Judges from other events can be reused without a new login
+    if not others:
+        return
+    with st.form("add_existing_judges"):
+        labels = {j["id"]: f"{j['name']} ({j['email']})" for j in others}
+        chosen = st.multiselect("Add existing judges", list(labels), format_func=labels.get)
+        if st.form_submit_button("Add to event") and chosen:
+            add_judges_to_event(chosen)
+            st.session_state["judge_add_success"] = f"Added {len(chosen)} judge(s) to this event."
+            st.rerun()
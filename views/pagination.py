@@ -0,0 +1,26 @@
+import math
+
+import streamlit as st
+
+
+def search_box(key: str, label: str) -> str:
+    """Search input that sends the matching pager back to the first page when it changes."""
+    search = st.text_input(label, key=f"{key}_search")
+    if st.session_state.get(f"{key}_last_search") != search:
+        st.session_state[f"{key}_last_search"] = search
+        st.session_state[f"{key}_page"] = 1
+    return search
+
+
+def pager(key: str, total: int, page_size: int) -> int:
+    """Page selector for a list of `total` rows; returns the zero-based page index."""
+    pages = max(1, math.ceil(total / page_size))
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    if pages == 1:
+        return 0
+    col_page, col_info = st.columns([1, 3])
+    page = col_page.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
+    col_info.caption(f"Page {page} of {pages} · {total} total")
+    return int(page) - 1
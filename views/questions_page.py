@@ -1,6 +1,7 @@
 import streamlit as st
 from db import (
-    get_questions,
+    ADMIN_PAGE_SIZE,
+    get_questions_page,
     insert_question,
     update_question,
     delete_question,
@@ -8,6 +9,9 @@ from db import (
     set_intro_message,
     clear_intro_message,
 )
+from page_data import load_page_data
+from views.bulk_import import render_import
+from views.pagination import pager
 
 
 def show():
@@ -26,9 +30,15 @@ def show():
     if st.session_state.pop("reset_add_question_form", False):
         st.session_state["add_question_prompt"] = ""
 
-    render_intro_message_editor()
+    page = st.session_state.get("questions_page", 1) - 1
+    data = load_page_data({
+        "questions": lambda: get_questions_page(page, ADMIN_PAGE_SIZE),
+        "intro": get_intro_message,
+    })
+    render_intro_message_editor(data["intro"])
     render_add_form()
-    render_question_list()
+    render_import("questions")
+    render_question_list(page, *data["questions"])
 
 
 def render_add_form():
@@ -46,12 +56,13 @@ def render_add_form():
                 st.rerun()
 
 
-def render_question_list():
+def render_question_list(page, questions, total):
     st.subheader("Current questions")
-    questions = get_questions()
-    if not questions:
+    if not total:
         st.info("No questions yet.")
         return
+    if pager("questions", total, ADMIN_PAGE_SIZE) != page:
+        st.rerun()
 
     for q in questions:
         with st.expander(f"{q['prompt']}"):
@@ -81,10 +92,10 @@ def render_delete_form(question):
             st.success("Question deleted.")
             st.rerun()
 
-def render_intro_message_editor():
+def render_intro_message_editor(current):
     st.subheader("Judge intro message")
     st.caption("Optional text shown above the competitor selector on the Enter Scores page.")
-    current = get_intro_message() or ""
+    current = current or ""
     with st.form("intro_message_form"):
         text = st.text_area("Intro message", value=current, height=120)
         col_save, col_clear = st.columns([1, 1])
@@ -1,13 +1,20 @@
 import streamlit as st
+from pymongo.errors import PyMongoError
 from db import (
     get_competitors,
     get_judge_by_id,
     get_questions,
-    get_answers_for_judge_competitor,
+    get_judge_answers,
     save_answers_for_judge,
-    get_banner_image,
+    get_banner_for_display,
     get_intro_message,
+    get_settings_generation,
+    set_current_event,
+    bind_causal_token,
+    JudgeVersion,
 )
+from page_data import PageLoadTimeout, load_page_data
+from submission_queue import get_submission_queue
 
 def show():
     user = st.session_state.get("user")
@@ -15,29 +22,27 @@ def show():
         st.error("Judge access required to enter scores.")
         st.stop()
 
+    # Independent reads go out together; the page waits for the slowest one
+    judge_id = user.get("judge_id")
+    data = load_page_data({
+        "generation": get_settings_generation,
+        "competitors": get_competitors,
+        "questions": get_questions,
+        "judge": lambda: get_judge_by_id(judge_id, JudgeVersion) if judge_id else None,
+    })
+
     # Show optional banner image configured by admin
-    try:
-        banner = get_banner_image()
-    except Exception:
-        banner = None
-    if banner and banner.get("data"):
-        st.image(banner["data"], width="stretch")
+    chrome = page_chrome(data["generation"])
+    if chrome["banner"]:
+        st.image(chrome["banner"], width="stretch")
 
     st.header("Enter Scores")
-    intro = get_intro_message()
-    if intro:
-        st.info(intro)
-
-    # Show success toast if flagged from previous save
-    if st.session_state.pop("score_saved", False):
-        st.toast("Scores saved.", icon="✅")
-
-    # Load competitors for scoring and active questions
-    competitors = get_competitors()
-    questions = get_questions()
+    if chrome["intro"]:
+        st.info(chrome["intro"])
 
-    judge_id = user.get("judge_id")
-    judge = get_judge_by_id(judge_id) if judge_id else None
+    competitors = data["competitors"]
+    questions = data["questions"]
+    judge = data["judge"]
     if not judge:
         st.error("Judge account is missing a profile.")
         return
@@ -56,26 +61,68 @@ def show():
     selected_label = st.selectbox("Select a competitor", list(competitor_options.keys()), index=0)
     comp = competitor_options[selected_label]
 
+    # Existing answers come from the session cache; get_judge_by_id above doubles as its freshness check
+    answer_cache = st.session_state.setdefault("judge_answer_cache", {})
+    get_judge_answers(judge, answer_cache)
+    render_scoring_form(judge_id, comp, questions, answer_cache)
+
+
+def page_chrome(settings_generation):
+    # Banner and intro are built once per session and only rebuilt when an admin changes settings
+    generation = (st.session_state.get("event_id"), settings_generation)
+    chrome = st.session_state.get("scoring_chrome")
+    if not chrome or chrome["generation"] != generation:
+        try:
+            loaded = load_page_data({"banner": _banner_or_none, "intro": get_intro_message})
+        except (PyMongoError, PageLoadTimeout):
+            # Score without them this run; not stored, so the next run tries again
+            return {"generation": None, "banner": None, "intro": None}
+        chrome = {"generation": generation, "banner": loaded["banner"], "intro": loaded["intro"]}
+        st.session_state["scoring_chrome"] = chrome
+    return chrome
+
+
+def _banner_or_none():
+    try:
+        return get_banner_for_display()
+    except (KeyError, TypeError):
+        # A banner document saved without image bytes
+        return None
+
+
+@st.fragment
+def render_scoring_form(judge_id, comp, questions, answer_cache):
+    # Radio clicks and edit toggles rerun only this fragment; a save reruns the page.
+    # Fragment reruns skip app.py, so restore the event scope and causal token for this thread
+    set_current_event(st.session_state.get("event_id"))
+    bind_causal_token(st.session_state.setdefault("causal_token", {}))
+    # Show success toast if flagged from previous save
+    if st.session_state.pop("score_saved", False):
+        st.toast("Scores saved.", icon="✅")
+
+    if "answers" not in answer_cache:
+        # A conflicting write dropped the cache; reload it with a full run
+        st.rerun()
+
     st.write(f"### Scoring: {comp['name']}")
 
-    # Load existing answers
-    existing_answers = get_answers_for_judge_competitor(judge_id, comp["id"])
+    # Write-behind mode: a queued submission shadows the stored answers until it is written
+    queue = get_submission_queue()
+    queued = queue.pending_answers(judge_id).get(comp["id"]) if queue else None
+    existing_answers = queued or answer_cache["answers"].get(comp["id"], {})
+    render_queue_status(queue, judge_id, comp["id"])
     answers = {}
     # Determine whether this competitor has already been scored by this judge
     scored = any(int(v) > 0 for v in (existing_answers.values() if existing_answers else []))
     editing_key = f"editing_{judge_id}_{comp['id']}"
     editing = st.session_state.get(editing_key, False)
 
-    # Show status and edit controls
+    # Show status and edit controls; callbacks flip the mode before the fragment reruns
     if scored and not editing:
         st.success("You have already submitted scores for this competitor.")
-        if st.button("Edit scores", key=f"edit_{comp['id']}"):
-            st.session_state[editing_key] = True
-            st.rerun()
+        st.button("Edit scores", key=f"edit_{comp['id']}", on_click=_set_editing, args=(editing_key, True))
     if editing:
-        if st.button("Cancel edit", key=f"cancel_edit_{comp['id']}"):
-            st.session_state[editing_key] = False
-            st.rerun()
+        st.button("Cancel edit", key=f"cancel_edit_{comp['id']}", on_click=_set_editing, args=(editing_key, False))
 
     st.write("#### Questions")
     for q in questions:
@@ -100,8 +147,27 @@ def show():
             st.error("Please score all questions before saving.")
         else:
             cleaned = {qid: val * 10 for qid, val in answers.items()}
-            save_answers_for_judge(judge_id, comp["id"], cleaned)
+            if queue:
+                st.session_state[f"queued_{judge_id}_{comp['id']}"] = queue.submit(judge_id, comp["id"], cleaned)
+            else:
+                save_answers_for_judge(judge_id, comp["id"], cleaned, cache=answer_cache)
             # clear editing state and show toast on rerun
             st.session_state[editing_key] = False
             st.session_state["score_saved"] = True
             st.rerun()
+
+
+def render_queue_status(queue, judge_id, competitor_id):
+    seq_key = f"queued_{judge_id}_{competitor_id}"
+    seq = st.session_state.get(seq_key)
+    if not queue or seq is None:
+        return
+    if queue.status(judge_id, competitor_id, seq) == "confirmed":
+        st.session_state.pop(seq_key)
+        st.caption("✅ Confirmed: your scores are stored.")
+    else:
+        st.caption("⏳ Queued: your scores will be stored in a moment.")
+
+
+def _set_editing(editing_key, value):
+    st.session_state[editing_key] = value